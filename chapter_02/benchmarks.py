@@ -0,0 +1,342 @@
+"""
+Benchmarks for the block game searches.
+
+Runs every search mode over a grid of block game instances, recording wall time, nodes
+expanded, peak frontier size and peak memory, and writes the results as JSON. Results
+can be compared against a saved baseline to flag regressions. Run from the chapter_02
+directory:
+
+    python benchmarks.py --output results.json
+    python benchmarks.py --baseline results.json --threshold 0.2
+    python benchmarks.py --bytes-per-node
+    python benchmarks.py --check-symmetry
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from moving_blocks import BlockConfigurationNode
+from search import AbstractSearch, BudgetExhausted
+
+
+# (red blocks, blue blocks, hands)
+DEFAULT_GRID = (
+    (3, 3, 2),
+    (3, 5, 2),
+    (5, 8, 3),
+    (10, 15, 4),
+    (20, 30, 5),
+    (40, 60, 6),
+)
+
+DEFAULT_MODES = (
+    'depth_first',
+    'breadth_first',
+    'iterative_deepening',
+    'greedy_best_first',
+    'a_star',
+    'bidirectional',
+    'parallel_breadth_first',
+    'breadth_first_to_mirror',
+)
+
+# metrics where a bigger number is worse, compared against the baseline
+COMPARED_METRICS = ('wall_time', 'nodes_expanded', 'max_frontier', 'peak_memory')
+
+# wall time differences smaller than this many seconds are treated as noise
+MIN_TIME_DIFFERENCE = 0.005
+
+
+class BenchmarkSearch(AbstractSearch):
+    """
+    Returns the final node of a successful search, so the length of the path found can
+    be recorded
+    """
+
+    def _return_result(self, final_node, is_success):
+        return final_node if is_success else None
+
+
+def run_search(mode, num_red_blocks, num_blue_blocks, num_hands, max_nodes=None,
+               compact=False):
+    """
+    Runs one search mode on a block game that starts with every block on pile 1
+
+    :param mode: string, name of the AbstractSearch method to run
+    :param num_red_blocks: integer, number of red blocks in the game
+    :param num_blue_blocks: integer, number of blue blocks in the game
+    :param num_hands: integer, number of hands available to move blocks
+    :param max_nodes: integer, node budget for the search; None for no limit
+    :param compact: boolean, whether nodes store packed integer states
+    :return: (result of the search, SearchStats)
+    """
+    starting_state = ((num_red_blocks, 0), (num_blue_blocks, 0), 0)
+    goal = ((0, num_red_blocks), (0, num_blue_blocks), 1)
+    starting_node = BlockConfigurationNode(starting_state, num_hands=num_hands,
+                                           compact=compact)
+
+    search = BenchmarkSearch(max_nodes=max_nodes, collect_stats=True)
+    if mode == 'bidirectional':
+        goal_node = BlockConfigurationNode(goal, num_hands=num_hands, compact=compact)
+        result = search.bidirectional(starting_node, goal_node)
+    elif mode == 'parallel_breadth_first':
+        result = search.parallel_breadth_first(starting_node, goal, workers=1)
+    elif mode == 'breadth_first_to_mirror':
+        # the goal is the starting state with the piles and hands swapped
+        result = search.breadth_first_to_mirror(starting_node)
+    else:
+        result = getattr(search, mode)(starting_node, goal)
+    return result, search.last_stats
+
+
+def benchmark(mode, num_red_blocks, num_blue_blocks, num_hands, repeat=3, max_nodes=None,
+              compact=False):
+    """
+    Times a search mode on one instance, then runs it once more under tracemalloc to
+    find its peak memory
+
+    :param repeat: integer, number of timed runs; the fastest is reported
+    :return: dictionary of results
+    """
+    wall_times = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        result, stats = run_search(mode, num_red_blocks, num_blue_blocks, num_hands,
+                                   max_nodes, compact)
+        wall_times.append(time.perf_counter() - started_at)
+
+    tracemalloc.start()
+    try:
+        run_search(mode, num_red_blocks, num_blue_blocks, num_hands, max_nodes, compact)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    if isinstance(result, BudgetExhausted):
+        outcome = 'budget_exhausted'
+    else:
+        outcome = 'solved' if result is not None else 'no_solution'
+
+    return {
+        'mode': mode,
+        'num_red_blocks': num_red_blocks,
+        'num_blue_blocks': num_blue_blocks,
+        'num_hands': num_hands,
+        'outcome': outcome,
+        'path_length': result._depth if outcome == 'solved' else None,
+        'wall_time': min(wall_times),
+        'nodes_expanded': stats.nodes_expanded,
+        'states_visited': stats.states_visited,
+        'max_frontier': stats.max_frontier,
+        'invalid_discarded': stats.invalid_discarded,
+        'expand_time': stats.expand_time,
+        'goal_test_time': stats.goal_test_time,
+        'peak_memory': peak_memory,
+    }
+
+
+def run_benchmarks(grid=DEFAULT_GRID, modes=DEFAULT_MODES, repeat=3, max_nodes=None,
+                   compact=False):
+    """
+    :param grid: iterable of (red blocks, blue blocks, hands)
+    :param modes: iterable of search mode names
+    :return: dictionary holding the environment and a list of results
+    """
+    results = []
+    for num_red_blocks, num_blue_blocks, num_hands in grid:
+        for mode in modes:
+            results.append(benchmark(mode, num_red_blocks, num_blue_blocks, num_hands,
+                                     repeat, max_nodes, compact))
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'compact': compact,
+        'results': results,
+    }
+
+
+def compare_to_baseline(report, baseline, threshold=0.2):
+    """
+    Finds results that got worse than the baseline by more than the threshold, or whose
+    outcome changed. Results are matched on mode and instance; anything missing from
+    either side is ignored.
+
+    :param report: dictionary returned by run_benchmarks
+    :param baseline: dictionary returned by an earlier run_benchmarks
+    :param threshold: float, allowed relative increase, e.g. 0.2 for 20%
+    :return: list of (result key, metric, baseline value, new value)
+    """
+    def result_key(result):
+        return (result['mode'], result['num_red_blocks'], result['num_blue_blocks'],
+                result['num_hands'])
+
+    baseline_results = dict((result_key(result), result) for result in baseline['results'])
+    regressions = []
+    for result in report['results']:
+        key = result_key(result)
+        if key not in baseline_results:
+            continue
+        for metric in COMPARED_METRICS:
+            old_value = baseline_results[key][metric]
+            new_value = result[metric]
+            if old_value is None or new_value <= old_value * (1 + threshold):
+                continue
+            if metric == 'wall_time' and new_value - old_value < MIN_TIME_DIFFERENCE:
+                continue
+            regressions.append((key, metric, old_value, new_value))
+        if result['outcome'] != baseline_results[key]['outcome']:
+            regressions.append((key, 'outcome', baseline_results[key]['outcome'],
+                                result['outcome']))
+    return regressions
+
+
+def check_symmetry(grid=DEFAULT_GRID, compact=False):
+    """
+    Checks that breadth_first_to_mirror finds paths to the same goal, of the same length,
+    as breadth_first, and prints how many states each of them visited
+
+    :param grid: iterable of (red blocks, blue blocks, hands)
+    :param compact: boolean, whether nodes store packed integer states
+    :return: list of instances where the two searches disagree
+    """
+    mismatches = []
+    print('{0:>12}{1:>8}{2:>8}{3:>12}{4:>12}'.format(
+        'instance', 'length', 'mirror', 'visited', 'mirror'))
+    for num_red_blocks, num_blue_blocks, num_hands in grid:
+        goal = ((0, num_red_blocks), (0, num_blue_blocks), 1)
+        result, stats = run_search('breadth_first', num_red_blocks, num_blue_blocks,
+                                   num_hands, compact=compact)
+        mirror_result, mirror_stats = run_search('breadth_first_to_mirror', num_red_blocks,
+                                                 num_blue_blocks, num_hands, compact=compact)
+        length = result._depth if result else None
+        mirror_length = mirror_result._depth if mirror_result else None
+        if length != mirror_length or (mirror_result and not mirror_result.fulfills_goal(goal)):
+            mismatches.append((num_red_blocks, num_blue_blocks, num_hands))
+        print('{0:>12}{1:>8}{2:>8}{3:>12}{4:>12}'.format(
+            '{0}/{1}/{2}'.format(num_red_blocks, num_blue_blocks, num_hands),
+            '-' if length is None else length, '-' if mirror_length is None else mirror_length,
+            stats.states_visited, mirror_stats.states_visited))
+    return mismatches
+
+
+def bytes_per_node(num_red_blocks, num_blue_blocks, num_hands, compact=False,
+                   num_nodes=100000):
+    """
+    Measures the memory held by block game nodes, by expanding the search tree
+    breadth-first (without pruning repeated states) and keeping every node alive.
+
+    :param num_red_blocks: integer, number of red blocks in the game
+    :param num_blue_blocks: integer, number of blue blocks in the game
+    :param num_hands: integer, number of hands available to move blocks
+    :param compact: boolean, whether nodes store packed integer states
+    :param num_nodes: integer, number of nodes to create
+    :return: float, average number of bytes allocated per node
+    """
+    starting_state = ((num_red_blocks, 0), (num_blue_blocks, 0), 0)
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        nodes = [BlockConfigurationNode(starting_state, num_hands=num_hands,
+                                        compact=compact)]
+        index = 0
+        while len(nodes) < num_nodes and index < len(nodes):
+            nodes.extend(nodes[index].generate_child_nodes())
+            index += 1
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return float(after - before) / len(nodes)
+
+
+def run_memory_benchmark(num_red_blocks=20, num_blue_blocks=30, num_hands=4):
+    for compact in (False, True):
+        print('{0:>8} states: {1:6.1f} bytes per node'.format(
+            'packed' if compact else 'tuple',
+            bytes_per_node(num_red_blocks, num_blue_blocks, num_hands, compact)))
+
+
+def print_report(report):
+    print('{0:<24}{1:>12}{2:>18}{3:>8}{4:>10}{5:>10}{6:>10}{7:>12}'.format(
+        'mode', 'instance', 'outcome', 'length', 'seconds', 'expanded', 'frontier',
+        'peak bytes'))
+    for result in report['results']:
+        print('{0:<24}{1:>12}{2:>18}{3:>8}{4:>10.4f}{5:>10}{6:>10}{7:>12}'.format(
+            result['mode'],
+            '{0}/{1}/{2}'.format(result['num_red_blocks'], result['num_blue_blocks'],
+                                 result['num_hands']),
+            result['outcome'],
+            '-' if result['path_length'] is None else result['path_length'],
+            result['wall_time'], result['nodes_expanded'], result['max_frontier'],
+            result['peak_memory']))
+
+
+def parse_instance(value):
+    try:
+        num_red_blocks, num_blue_blocks, num_hands = (int(part) for part in value.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError('expected RED,BLUE,HANDS, got {0!r}'.format(value))
+    return num_red_blocks, num_blue_blocks, num_hands
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--instance', action='append', type=parse_instance,
+                        metavar='RED,BLUE,HANDS',
+                        help='block game to run; may be repeated (default: built-in grid)')
+    parser.add_argument('--mode', action='append', choices=DEFAULT_MODES,
+                        help='search mode to run; may be repeated (default: all)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timed runs per benchmark; the fastest is kept')
+    parser.add_argument('--max-nodes', type=int, default=20000,
+                        help='node budget for each search, so slow modes still finish')
+    parser.add_argument('--compact', action='store_true',
+                        help='use packed integer states')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='JSON file from an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative increase over the baseline counted as a regression')
+    parser.add_argument('--check-symmetry', action='store_true',
+                        help='only check that the mirror search agrees with breadth_first')
+    parser.add_argument('--bytes-per-node', action='store_true',
+                        help='only measure memory per node for tuple and packed states, '
+                             'on the first --instance (default: 20,30,4)')
+    args = parser.parse_args(argv)
+
+    if args.bytes_per_node:
+        # measured on the first --instance only
+        run_memory_benchmark(*(args.instance[0] if args.instance else ()))
+        return 0
+
+    if args.check_symmetry:
+        mismatches = check_symmetry(args.instance or DEFAULT_GRID, args.compact)
+        for instance in mismatches:
+            print('MISMATCH {0}'.format('/'.join(str(part) for part in instance)))
+        return 1 if mismatches else 0
+
+    report = run_benchmarks(args.instance or DEFAULT_GRID, args.mode or DEFAULT_MODES,
+                            args.repeat, args.max_nodes, args.compact)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare_to_baseline(report, json.load(baseline_file),
+                                              args.threshold)
+        for key, metric, old_value, new_value in regressions:
+            print('REGRESSION {0} {1}: {2} -> {3}'.format(
+                '/'.join(str(part) for part in key), metric, old_value, new_value))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
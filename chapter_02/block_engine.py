@@ -0,0 +1,403 @@
+"""
+A generalised block game. The game in moving_blocks always has red and blue blocks on
+two piles; here the number of colours, the number of piles and the rules about which
+colours may not outnumber which are all parameters of a BlockGameSpec:
+
+- There are totals[c] blocks of colour c, which all start on the first pile.
+- You want to move all of them to the last pile.
+- The hands carry between 1 and num_hands blocks from the pile they are on to another
+    pile (only a neighbouring pile with adjacent_only=True).
+- For every (smaller, larger) pair in constraints, no pile may ever have more blocks
+    of colour smaller than of colour larger.
+
+The two pile, red <= blue game of moving_blocks is
+
+    block_game_spec((num_red_blocks, num_blue_blocks), num_hands=num_hands,
+                    constraints=((0, 1),))
+
+States are flat bytes objects of spec.width counts: the count of each colour on pile 0,
+then on pile 1 and so on, followed by the pile the hands are on. The moves and the
+index pairs that the constraints compare are worked out once per spec, so generating a
+child is a few byte updates and comparisons.
+"""
+from functools import lru_cache
+from itertools import product
+
+from search import AbstractNode, AbstractSearch
+
+
+# Counts are stored one per byte
+MAX_BLOCKS_PER_COLOUR = 255
+
+# Number of specs kept by block_game_spec
+SPEC_CACHE_SIZE = 64
+
+
+class BlockGameSpec(object):
+    """
+    The rules of one variant of the block game, plus the tables derived from them.
+
+    moves[pile] holds a (destination, transfers, checks) entry for every way of
+    carrying blocks away from pile, where transfers are (source index, destination
+    index, count) for each colour carried, and checks are the (smaller index, larger
+    index) pairs of the constraints on the two piles the move changes.
+    """
+
+    __slots__ = ('totals', 'num_colours', 'num_piles', 'num_hands', 'constraints',
+                 'adjacent_only', 'hand_index', 'width', 'pile_checks', 'moves')
+
+    def __init__(self, totals, num_piles=2, num_hands=2, constraints=(),
+                 adjacent_only=False):
+        """
+        :param totals: sequence of integers, number of blocks of each colour
+        :param num_piles: integer, number of piles; at least 2
+        :param num_hands: integer, number of hands available to move blocks
+        :param constraints: sequence of (smaller, larger) colour indices, meaning that
+                colour smaller may never outnumber colour larger on a pile
+        :param adjacent_only: boolean, whether blocks can only be carried to the
+                neighbouring piles instead of to any other pile
+        """
+        self.totals = tuple(totals)
+        self.num_colours = len(self.totals)
+        self.num_piles = num_piles
+        self.num_hands = num_hands
+        self.constraints = tuple(tuple(pair) for pair in constraints)
+        self.adjacent_only = adjacent_only
+
+        if not self.totals:
+            raise ValueError('the game needs at least one colour')
+        if not all(0 <= total <= MAX_BLOCKS_PER_COLOUR for total in self.totals):
+            raise ValueError('block totals must be between 0 and {0}'.format(
+                MAX_BLOCKS_PER_COLOUR))
+        if num_piles < 2:
+            raise ValueError('the game needs at least two piles')
+        if num_hands < 1:
+            raise ValueError('the game needs at least one hand')
+        for smaller, larger in self.constraints:
+            if not (0 <= smaller < self.num_colours and 0 <= larger < self.num_colours):
+                raise ValueError('unknown colour in constraint {0!r}'.format(
+                    (smaller, larger)))
+
+        self.hand_index = num_piles * self.num_colours
+        self.width = self.hand_index + 1
+        self.pile_checks = tuple(
+            tuple((self._index(pile, smaller), self._index(pile, larger))
+                  for smaller, larger in self.constraints)
+            for pile in range(num_piles))
+        self.moves = tuple(self._moves_from(pile) for pile in range(num_piles))
+
+    def _index(self, pile, colour):
+        return pile * self.num_colours + colour
+
+    def destinations(self, pile):
+        """
+        :param pile: integer, pile the hands are on
+        :return: list of the piles the hands can carry blocks to
+        """
+        if self.adjacent_only:
+            return [other for other in (pile - 1, pile + 1) if 0 <= other < self.num_piles]
+        return [other for other in range(self.num_piles) if other != pile]
+
+    def _moves_from(self, pile):
+        loads = [load for load in product(*[range(min(total, self.num_hands) + 1)
+                                            for total in self.totals])
+                 if 0 < sum(load) <= self.num_hands]
+
+        moves = []
+        for destination in self.destinations(pile):
+            checks = self.pile_checks[pile] + self.pile_checks[destination]
+            for load in loads:
+                transfers = tuple((self._index(pile, colour),
+                                   self._index(destination, colour), count)
+                                  for colour, count in enumerate(load) if count)
+                moves.append((destination, transfers, checks))
+        return tuple(moves)
+
+    def pack(self, state_tuple):
+        """
+        :param state_tuple: (tuple of the colour counts on each pile, hand location)
+        :return: bytes
+        """
+        pile_counts, hand_location = state_tuple
+        if len(pile_counts) != self.num_piles:
+            raise ValueError('expected {0} piles, got {1}'.format(
+                self.num_piles, len(pile_counts)))
+        counts = [count for pile in pile_counts for count in pile]
+        if len(counts) != self.hand_index:
+            raise ValueError('expected {0} colours on each pile'.format(self.num_colours))
+        counts.append(hand_location)
+        return bytes(counts)
+
+    def unpack(self, state):
+        """
+        :param state: bytes returned by pack
+        :return: (tuple of the colour counts on each pile, hand location)
+        """
+        num_colours = self.num_colours
+        return (tuple(tuple(state[start:start + num_colours])
+                      for start in range(0, self.hand_index, num_colours)),
+                state[self.hand_index])
+
+    def is_valid(self, state):
+        """
+        :param state: bytes of spec.width counts
+        :return: boolean, whether state holds every block once, has the hands on a
+                pile and breaks none of the constraints
+        """
+        if len(state) != self.width or state[self.hand_index] >= self.num_piles:
+            return False
+        for colour, total in enumerate(self.totals):
+            if sum(state[colour:self.hand_index:self.num_colours]) != total:
+                return False
+        for checks in self.pile_checks:
+            for smaller, larger in checks:
+                if state[smaller] > state[larger]:
+                    return False
+        return True
+
+    def mirror(self, state):
+        """
+        The rules look the same with the piles in reverse order.
+
+        :param state: bytes returned by pack
+        :return: bytes, state with the order of the piles and the hand position reversed
+        """
+        num_colours = self.num_colours
+        return b''.join([state[start:start + num_colours]
+                         for start in range(self.hand_index - num_colours, -1,
+                                            -num_colours)] +
+                        [bytes((self.num_piles - 1 - state[self.hand_index],))])
+
+    @property
+    def starting_state(self):
+        """
+        :return: bytes, every block on the first pile with the hands there
+        """
+        return bytes(self.totals) + bytes(self.hand_index - self.num_colours + 1)
+
+    @property
+    def goal(self):
+        """
+        :return: bytes, every block on the last pile with the hands there
+        """
+        return (bytes(self.hand_index - self.num_colours) + bytes(self.totals) +
+                bytes((self.num_piles - 1,)))
+
+
+@lru_cache(maxsize=SPEC_CACHE_SIZE)
+def _cached_spec(totals, num_piles, num_hands, constraints, adjacent_only):
+    return BlockGameSpec(totals, num_piles, num_hands, constraints, adjacent_only)
+
+
+def block_game_spec(totals, num_piles=2, num_hands=2, constraints=(), adjacent_only=False):
+    """
+    BlockGameSpec shared between every search of the same variant, so its move tables
+    are only built once. Takes the same arguments as BlockGameSpec.
+
+    :return: BlockGameSpec
+    """
+    return _cached_spec(tuple(totals), num_piles, num_hands,
+                        tuple(tuple(pair) for pair in constraints), adjacent_only)
+
+
+class BlockEngineNode(AbstractNode):
+    """
+    A state of a BlockGameSpec variant, plus the way it was reached. The node state is
+    the flat bytes form; goals may be given either packed or as state tuples.
+    """
+
+    __slots__ = ('_current_state', '_parent', '_depth', '_spec', '_is_valid')
+
+    def __init__(self, new_state, parent=None, spec=None):
+        """
+        :param new_state: bytes, or a state tuple to be packed with spec
+        :param parent: node that is the parent of the current node in the search tree
+        :param spec: BlockGameSpec of the game. Ignore this param if passing parent --
+                the value will be taken from the parent if the parent exists.
+        """
+        self._parent = parent
+        if parent is not None:
+            self._spec = parent._spec
+            self._depth = parent._depth + 1
+        else:
+            self._spec = spec
+            self._depth = 0
+        self._current_state = self._packed(new_state)
+        self._is_valid = self._spec.is_valid(self._current_state)
+
+    def _packed(self, state):
+        return state if isinstance(state, bytes) else self._spec.pack(state)
+
+    @property
+    def state(self):
+        """
+        :return: (tuple of the colour counts on each pile, hand location)
+        """
+        return self._spec.unpack(self._current_state)
+
+    @property
+    def _game_state(self):
+        """
+        :return: list of state tuples from the root of the search tree to this node
+        """
+        game_state = []
+        node = self
+        while node is not None:
+            game_state.append(node.state)
+            node = node._parent
+        game_state.reverse()
+        return game_state
+
+    def is_valid(self):
+        return self._is_valid
+
+    def state_key(self):
+        return self._current_state
+
+    def goal_key(self, goal):
+        return self._packed(goal)
+
+    def mirror_key(self):
+        return self._spec.mirror(self._current_state)
+
+    def canonical_key(self):
+        return min(self._current_state, self.mirror_key())
+
+    def fulfills_goal(self, goal):
+        return self._current_state == self._packed(goal)
+
+    def generate_child_nodes(self):
+        """
+        Tries every move in the spec's move table for the pile the hands are on. Only
+        the counts a move changes are compared, against the index pairs of the
+        constraints on the two piles involved.
+
+        :return: generator of valid child nodes; invalid nodes have no children
+        """
+        if not self._is_valid:
+            return
+
+        state = self._current_state
+        hand_index = self._spec.hand_index
+        for destination, transfers, checks in self._spec.moves[state[hand_index]]:
+            for source_index, _, count in transfers:
+                if state[source_index] < count:
+                    break
+            else:
+                child = bytearray(state)
+                for source_index, destination_index, count in transfers:
+                    child[source_index] -= count
+                    child[destination_index] += count
+                child[hand_index] = destination
+
+                for smaller, larger in checks:
+                    if child[smaller] > child[larger]:
+                        break
+                else:
+                    yield self._new_child(bytes(child))
+
+    def candidate_child_count(self):
+        """
+        :return: number of moves that don't take more blocks than the pile holds, valid
+                or not; 0 for an invalid node
+        """
+        if not self._is_valid:
+            return 0
+        state = self._current_state
+        return sum(1 for _, transfers, _ in self._spec.moves[state[self._spec.hand_index]]
+                   if all(state[source_index] >= count
+                          for source_index, _, count in transfers))
+
+    def _new_child(self, new_state):
+        node = BlockEngineNode.__new__(BlockEngineNode)
+        node._parent = self
+        node._spec = self._spec
+        node._current_state = new_state
+        node._depth = self._depth + 1
+        node._is_valid = True
+        return node
+
+    def generate_parent_nodes(self):
+        """
+        Blocks can always be carried straight back to the pile they came from, so the
+        states that lead to this node are exactly the states it leads to.
+
+        :return: generator of valid nodes one move away, with this node as their parent
+        """
+        return self.generate_child_nodes()
+
+    def detached(self):
+        node = BlockEngineNode.__new__(BlockEngineNode)
+        for attribute in self.__slots__:
+            setattr(node, attribute, getattr(self, attribute))
+        node._parent = None
+        return node
+
+    def attach(self, parent):
+        self._parent = parent
+
+    def path_cost(self):
+        return self._depth
+
+    def heuristic(self, goal):
+        """
+        Lower bound on the number of moves needed to reach goal: every block that has
+        to leave a pile is carried at least once, at most num_hands blocks at a time.
+
+        :param goal: bytes or state tuple
+        :return: integer
+        """
+        goal = self._packed(goal)
+        state = self._current_state
+        blocks_to_move = sum(max(state[index] - goal[index], 0)
+                             for index in range(self._spec.hand_index))
+        return -(-blocks_to_move // self._spec.num_hands)
+
+
+class BlockEngineSolver(AbstractSearch):
+    """
+    Solves a BlockGameSpec variant, moving every block from the first pile to the last,
+    with any of the AbstractSearch algorithms.
+
+    Successful searches return the list of state tuples from the starting state to the
+    goal.
+    """
+
+    ALGORITHMS = (
+        'depth_first',
+        'breadth_first',
+        'iterative_deepening',
+        'greedy_best_first',
+        'a_star',
+        'bidirectional',
+        'breadth_first_to_mirror',
+    )
+
+    def __init__(self, spec, **search_options):
+        """
+        :param spec: BlockGameSpec of the variant to solve
+        :param search_options: budgets and other keyword arguments for AbstractSearch
+        """
+        super(BlockEngineSolver, self).__init__(**search_options)
+        self._spec = spec
+
+    def solve(self, algorithm='breadth_first'):
+        """
+        :param algorithm: string, one of ALGORITHMS
+        :return: list of states from the starting state to the goal; None if there is
+                no solution; BudgetExhausted if a budget ran out first
+        """
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError('unknown algorithm {0!r}'.format(algorithm))
+
+        starting_node = BlockEngineNode(self._spec.starting_state, spec=self._spec)
+        if algorithm == 'bidirectional':
+            goal_node = BlockEngineNode(self._spec.goal, spec=self._spec)
+            return self.bidirectional(starting_node, goal_node)
+        elif algorithm == 'breadth_first_to_mirror':
+            # reversing the piles turns the starting state into the goal
+            return self.breadth_first_to_mirror(starting_node)
+        return getattr(self, algorithm)(starting_node, self._spec.goal)
+
+    def _return_result(self, final_node, is_success):
+        return final_node._game_state if is_success else None
@@ -0,0 +1,340 @@
+"""
+Breadth-first search that keeps its levels and visited states on disk, for games with
+more states than fit in memory.
+
+States are packed integers (see moving_blocks.BlockStateCodec) stored as sorted runs of
+unsigned 64 bit numbers. Each level is deduplicated by merging sorted runs against the
+visited file, and the search checkpoints after every completed level, so an interrupted
+search resumes from the last level it finished.
+"""
+import heapq
+import json
+import mmap
+import os
+from array import array
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from moving_blocks import BlockStateCodec, packed_successors
+
+
+class ExternalBreadthFirstSearch(object):
+    """
+    Breadth-first search over packed integer states, with every level and the set of
+    visited states held in files in a working directory:
+
+        level_<n>.bin     sorted states first reached after n moves
+        visited_<n>.bin   sorted states of levels 0 to n
+        checkpoint.json   last completed level, and the outcome once there is one
+
+    Only run_size successor states are held in memory at a time. Level files are kept
+    until the search is finished with, since path() reads them back.
+    """
+
+    CHECKPOINT_FILE = 'checkpoint.json'
+
+    SEARCHING = 'searching'
+    SOLVED = 'solved'
+    NO_SOLUTION = 'no_solution'
+
+    def __init__(self, directory, successors, predecessors=None, run_size=1 << 20,
+                 on_level=None):
+        """
+        :param directory: string, working directory; created if it does not exist
+        :param successors: function taking a packed state and returning an iterable of
+                the packed states one move away
+        :param predecessors: function taking a packed state and returning an iterable
+                of the packed states one move before it; defaults to successors, for
+                games where every move can be undone
+        :param run_size: integer, number of successor states sorted in memory at a time
+        :param on_level: function called with (level number, number of states in it)
+                after each level is checkpointed; None for no progress reports
+        """
+        self.directory = directory
+        self._successors = successors
+        self._predecessors = predecessors or successors
+        self._run_size = run_size
+        self._on_level = on_level
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def search(self, starting_state, goal, identity=None):
+        """
+        Searches from starting_state, or carries on from the checkpoint if the
+        directory holds one for the same starting state, goal and identity.
+
+        :param starting_state: integer, packed starting state
+        :param goal: integer, packed goal state
+        :param identity: JSON-serialisable value naming the game being searched, such
+                as its parameters. Packed states of different games can be equal, so
+                a checkpoint is only resumed if its identity matches.
+        :return: integer, number of moves on a shortest path to the goal, or None if the
+                goal can't be reached
+        """
+        # compare in the form the checkpoint stores it, where tuples become lists
+        identity = json.loads(json.dumps(identity))
+        checkpoint = self._read_checkpoint()
+        if (checkpoint is None or checkpoint['starting_state'] != starting_state or
+                checkpoint['goal'] != goal or checkpoint.get('identity') != identity):
+            checkpoint = self._start(starting_state, goal, identity)
+
+        while checkpoint['status'] == self.SEARCHING:
+            checkpoint = self._next_level(checkpoint)
+            if self._on_level is not None:
+                self._on_level(checkpoint['level'], checkpoint['level_size'])
+        return checkpoint['depth']
+
+    def path(self):
+        """
+        Reads a shortest path back out of the level files of a solved search, by
+        looking up a predecessor of each state in the level before it.
+
+        :return: list of packed states from the starting state to the goal, or None if
+                the search has not found the goal
+        """
+        checkpoint = self._read_checkpoint()
+        if checkpoint is None or checkpoint['status'] != self.SOLVED:
+            return None
+
+        path = [checkpoint['goal']]
+        for level in range(checkpoint['depth'] - 1, -1, -1):
+            with _PackedReader(self._level_path(level)) as states:
+                path.append(next(state for state in self._predecessors(path[-1])
+                                 if _contains(states, state)))
+        path.reverse()
+        return path
+
+    def _start(self, starting_state, goal, identity):
+        for name in os.listdir(self.directory):
+            if name.endswith('.bin') or name.endswith('.tmp'):
+                os.remove(os.path.join(self.directory, name))
+        for file_name in (self._level_path(0), self._visited_path(0)):
+            with _PackedWriter(file_name) as writer:
+                writer.write(starting_state)
+
+        checkpoint = {
+            'starting_state': starting_state,
+            'goal': goal,
+            'identity': identity,
+            'level': 0,
+            'level_size': 1,
+            'status': self.SEARCHING,
+            'depth': None,
+        }
+        if starting_state == goal:
+            checkpoint['status'] = self.SOLVED
+            checkpoint['depth'] = 0
+        self._write_checkpoint(checkpoint)
+        return checkpoint
+
+    def _next_level(self, checkpoint):
+        """
+        Expands the last completed level into the next one and checkpoints it
+
+        :return: the new checkpoint
+        """
+        level = checkpoint['level']
+        runs = self._write_sorted_runs(level)
+
+        next_level_path = self._level_path(level + 1)
+        next_visited_path = self._visited_path(level + 1)
+        level_size = 0
+        found_goal = False
+        with ExitStack() as stack:
+            candidates = _unique(heapq.merge(*[stack.enter_context(_PackedReader(run))
+                                               for run in runs]))
+            visited = stack.enter_context(_PackedReader(self._visited_path(level)))
+            level_writer = stack.enter_context(_PackedWriter(next_level_path + '.tmp'))
+            visited_writer = stack.enter_context(_PackedWriter(next_visited_path + '.tmp'))
+            for state, is_new in _merge_new(candidates, visited):
+                visited_writer.write(state)
+                if is_new:
+                    level_writer.write(state)
+                    level_size += 1
+                    if state == checkpoint['goal']:
+                        found_goal = True
+        for run in runs:
+            os.remove(run)
+
+        # only once both files are complete do they replace anything, and only once the
+        # checkpoint moves on does the search rely on them
+        os.replace(next_level_path + '.tmp', next_level_path)
+        os.replace(next_visited_path + '.tmp', next_visited_path)
+
+        checkpoint = dict(checkpoint, level=level + 1, level_size=level_size)
+        if found_goal:
+            checkpoint['status'] = self.SOLVED
+            checkpoint['depth'] = level + 1
+        elif level_size == 0:
+            checkpoint['status'] = self.NO_SOLUTION
+        self._write_checkpoint(checkpoint)
+        os.remove(self._visited_path(level))
+        return checkpoint
+
+    def _write_sorted_runs(self, level):
+        """
+        Generates the successors of a level in batches of run_size, writing each batch
+        sorted and without repeats to its own file
+
+        :return: list of file names
+        """
+        runs = []
+        batch = []
+
+        def write_run():
+            batch.sort()
+            run = os.path.join(self.directory, 'run_{0:06d}.bin'.format(len(runs)))
+            with _PackedWriter(run) as writer:
+                for state in _unique(batch):
+                    writer.write(state)
+            runs.append(run)
+            del batch[:]
+
+        with _PackedReader(self._level_path(level)) as states:
+            for state in states:
+                batch.extend(self._successors(state))
+                if len(batch) >= self._run_size:
+                    write_run()
+        if batch or not runs:
+            write_run()
+        return runs
+
+    def _level_path(self, level):
+        return os.path.join(self.directory, 'level_{0:06d}.bin'.format(level))
+
+    def _visited_path(self, level):
+        return os.path.join(self.directory, 'visited_{0:06d}.bin'.format(level))
+
+    def _read_checkpoint(self):
+        checkpoint_path = os.path.join(self.directory, self.CHECKPOINT_FILE)
+        if not os.path.exists(checkpoint_path):
+            return None
+        with open(checkpoint_path) as checkpoint_file:
+            return json.load(checkpoint_file)
+
+    def _write_checkpoint(self, checkpoint):
+        checkpoint_path = os.path.join(self.directory, self.CHECKPOINT_FILE)
+        with open(checkpoint_path + '.tmp', 'w') as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(checkpoint_path + '.tmp', checkpoint_path)
+
+
+class _PackedWriter(object):
+    """
+    Appends packed states to a file of unsigned 64 bit numbers, a buffer at a time
+    """
+
+    BUFFER_SIZE = 1 << 16
+
+    def __init__(self, file_name):
+        self._file = open(file_name, 'wb')
+        self._buffer = array('Q')
+
+    def write(self, state):
+        self._buffer.append(state)
+        if len(self._buffer) >= self.BUFFER_SIZE:
+            self._flush()
+
+    def _flush(self):
+        self._buffer.tofile(self._file)
+        self._buffer = array('Q')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._flush()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        return False
+
+
+class _PackedReader(object):
+    """
+    Memory-maps a file written by _PackedWriter, giving a sequence of its states
+    """
+
+    def __init__(self, file_name):
+        self._file_name = file_name
+        self._file = None
+        self._mmap = None
+        self._states = ()
+
+    def __enter__(self):
+        self._file = open(self._file_name, 'rb')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            # empty files can't be memory-mapped
+            self._states = ()
+        else:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._states = memoryview(self._mmap).cast('Q')
+        return self._states
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not isinstance(self._states, tuple):
+            self._states.release()
+            self._mmap.close()
+        self._file.close()
+        return False
+
+
+def _unique(sorted_states):
+    """
+    :param sorted_states: iterable of states in ascending order
+    :return: generator of the states without repeats
+    """
+    previous = None
+    for state in sorted_states:
+        if state != previous:
+            yield state
+            previous = state
+
+
+def _merge_new(candidates, visited):
+    """
+    Walks two sorted sequences of distinct states together
+
+    :return: generator of (state, whether it is missing from visited) for every state
+            in either sequence, in ascending order
+    """
+    visited = iter(visited)
+    next_visited = next(visited, None)
+    for state in candidates:
+        while next_visited is not None and next_visited < state:
+            yield next_visited, False
+            next_visited = next(visited, None)
+        if next_visited == state:
+            yield state, False
+            next_visited = next(visited, None)
+        else:
+            yield state, True
+    while next_visited is not None:
+        yield next_visited, False
+        next_visited = next(visited, None)
+
+
+def _contains(sorted_states, state):
+    index = bisect_left(sorted_states, state)
+    return index < len(sorted_states) and sorted_states[index] == state
+
+
+def solve_block_game(num_red_blocks, num_blue_blocks, num_hands, directory, **options):
+    """
+    Moves every block from pile 1 to pile 2 with an ExternalBreadthFirstSearch, resuming
+    from any checkpoint left in directory by an earlier run.
+
+    :param options: keyword arguments for ExternalBreadthFirstSearch
+    :return: list of state tuples from the starting state to the goal, or None if there
+            is no solution
+    """
+    codec = BlockStateCodec(num_red_blocks, num_blue_blocks)
+    search = ExternalBreadthFirstSearch(directory, packed_successors(codec, num_hands),
+                                        **options)
+    if search.search(codec.pack(((num_red_blocks, 0), (num_blue_blocks, 0), 0)),
+                     codec.pack(((0, num_red_blocks), (0, num_blue_blocks), 1)),
+                     identity=(num_red_blocks, num_blue_blocks, num_hands)) is None:
+        return None
+    return [codec.unpack(state) for state in search.path()]
@@ -14,17 +14,158 @@ so we're just going to reword it as a blocks game. The rules are as follows:
 - You can ignore the blue/red count for blocks in the hand
 """
 
+import argparse
+import json
 import os
+import sys
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from functools import lru_cache
 
-from search import AbstractNode, AbstractSearch
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from search import AbstractNode, AbstractSearch, BudgetExhausted
+from solution_cache import SolutionCache
+from solution_trace import row_template_for_state
+
+
+# Number of move tables kept by move_table and legal_moves. The tables only depend on
+# how many blocks the hands could pick up, so a few hundred cover most games.
+MOVE_TABLE_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=MOVE_TABLE_CACHE_SIZE)
+def move_table(red_count, blue_count, num_hands):
+    """
+    Figures out the possible moves for each pile of blocks in a game, shared between
+    every node (and every search) with the same block totals and number of hands.
+
+    :param red_count: integer, total number of red blocks in the game
+    :param blue_count: integer, total number of blue blocks in the game
+    :param num_hands: integer, number of hands available to move blocks
+    :return: tuple of two tuples, where each item represents a move that can be made
+        from pile 1 and pile 2 respectively, as ((red pile1, red pile2),
+        (blue pile1, blue pile2)) changes in block count
+    """
+    pile1 = []
+    pile2 = []
+
+    for red in range(num_hands+1):
+        for blue in range(num_hands, -1, -1):
+            move_is_possible = (red <= red_count and
+                                blue <= blue_count and
+                                red + blue <= num_hands and
+                                not (red == 0 and blue == 0))
+
+            if move_is_possible:
+                pile1.append(((-red, red), (-blue, blue)))
+                pile2.append(((red, -red), (blue, -blue)))
+
+    return tuple(pile1), tuple(pile2)
+
+
+def legal_moves(red_count, blue_count, num_hands, hand_location):
+    """
+    The moves that can be made from a pile without taking more blocks than it holds.
+    Which moves are legal only depends on how many of each colour the hands could
+    pick up, so piles bigger than num_hands share a cached table.
+
+    :param red_count: integer, number of red blocks on the pile the hands are at
+    :param blue_count: integer, number of blue blocks on the pile the hands are at
+    :param num_hands: integer, number of hands available to move blocks
+    :param hand_location: BlockConfigurationNode.PILE1_INDEX or PILE2_INDEX
+    :return: tuple of moves, in the format of move_table
+    """
+    return move_table(min(red_count, num_hands), min(blue_count, num_hands),
+                      num_hands)[hand_location]
+
+
+class BlockStateCodec(object):
+    """
+    Packs block game state tuples into a single integer and back.
+
+    The blocks on pile 2 are implied by the totals, so a state only needs the reds and
+    blues on pile 1 plus the hand position, which are stored as a mixed-radix number:
+
+        packed = (pile1_red * (total_blue + 1) + pile1_blue) * 2 + hand_location
+
+    Every valid state of a game therefore maps onto range(codec.size).
+    """
+
+    __slots__ = ('total_red', 'total_blue', 'size')
+
+    def __init__(self, total_red, total_blue):
+        """
+        :param total_red: integer, total number of red blocks in the game
+        :param total_blue: integer, total number of blue blocks in the game
+        """
+        self.total_red = total_red
+        self.total_blue = total_blue
+        self.size = (total_red + 1) * (total_blue + 1) * 2
+
+    @classmethod
+    def for_state(cls, state_tuple):
+        """
+        :param state_tuple: tuple representing a valid node state
+        :return: BlockStateCodec sized for the game the state belongs to
+        """
+        return cls(*BlockConfigurationNode.total_red_and_blue_count_for_state(state_tuple))
+
+    def pack(self, state_tuple):
+        """
+        :param state_tuple: tuple representing a node state with non-negative counts
+        :return: integer
+        """
+        (pile1_red, _), (pile1_blue, _), hand_location = state_tuple
+        return (pile1_red * (self.total_blue + 1) + pile1_blue) * 2 + hand_location
+
+    def unpack(self, packed_state):
+        """
+        :param packed_state: integer returned by pack
+        :return: tuple representing the node state
+        """
+        piles, hand_location = divmod(packed_state, 2)
+        pile1_red, pile1_blue = divmod(piles, self.total_blue + 1)
+        return ((pile1_red, self.total_red - pile1_red),
+                (pile1_blue, self.total_blue - pile1_blue),
+                hand_location)
+
+    def mirror(self, packed_state):
+        """
+        Swapping the two piles and the hand position turns pile 1 counts c into
+        total - c and the hand h into 1 - h, which reverses the packed number.
+
+        :param packed_state: integer returned by pack
+        :return: integer, packed state with the piles and hand position swapped
+        """
+        return self.size - 1 - packed_state
+
+    def red_and_blue_counts_for_each_pile(self, packed_state):
+        """
+        :param packed_state: integer returned by pack
+        :return: ((reds in pile1, blues in pile1), (reds in pile2, blues in pile2))
+        """
+        pile1_red, pile1_blue = divmod(packed_state // 2, self.total_blue + 1)
+        return ((pile1_red, pile1_blue),
+                (self.total_red - pile1_red, self.total_blue - pile1_blue))
 
 
 class BlockConfigurationNode(AbstractNode):
     """
-    TODO: write docs
+    A configuration of the block game, plus the way it was reached.
+
+    States are tuples of ((red pile1, red pile2), (blue pile1, blue pile2), hand
+    location). With compact=True the root packs its state using a BlockStateCodec and
+    every node in the tree stores a single integer instead, which roughly halves the
+    memory used per node for large searches.
     """
 
-    _allowed_moves = {}
+    __slots__ = ('_current_state', '_parent', '_depth', '_num_hands', '_is_valid',
+                 '_codec')
 
     PILE1_INDEX = 0
     PILE2_INDEX = 1
@@ -33,30 +174,60 @@ class BlockConfigurationNode(AbstractNode):
     RED_INDEX = 0
     BLUE_INDEX = 1
 
-    def __init__(self, new_state, parent=None, num_hands=2):
+    def __init__(self, new_state, parent=None, num_hands=2, compact=False):
         """
         Creates a node for use in the 'Block Game' problem.
 
         :param new_state: tuple representing the current node state. Should be
-                generated using BlockConfigurationNode.create_state
+                generated using BlockConfigurationNode.create_state. Children of a
+                compact node take the packed integer instead.
         :param parent: node that is the parent of the current node in the search tree
         :param num_hands: integer, number of hands available to move blocks. Ignore
                 this param if passing parent -- the value will be taken from the
                 parent if the parent exists.
+        :param compact: boolean, whether to store states as packed integers. Ignored
+                when passing parent, like num_hands.
         """
-        self._current_state = new_state
         self._parent = parent
 
-        if parent:
-            self._game_state = parent._game_state + [new_state]
+        if parent is not None:
+            self._current_state = new_state
+            self._codec = parent._codec
+            self._depth = parent._depth + 1
             self._num_hands = parent._num_hands
-            self._possible_moves = parent._possible_moves
         else:
-            self._game_state = [new_state]
+            self._codec = BlockStateCodec.for_state(new_state) if compact else None
+            self._current_state = self._codec.pack(new_state) if compact else new_state
+            self._depth = 0
             self._num_hands = num_hands
-            self._possible_moves = self._calculate_possible_moves()
 
-        self._is_valid = self._calculate_validity(self._current_state)
+        self._is_valid = self._calculate_validity(self.state)
+
+    @property
+    def state(self):
+        """
+        :return: tuple representing the current node state, whether or not it is packed
+        """
+        if self._codec is None:
+            return self._current_state
+        return self._codec.unpack(self._current_state)
+
+    @property
+    def _game_state(self):
+        """
+        The states from the root of the search tree down to this node. Nodes only keep
+        a pointer to their parent, so the list is rebuilt from the parent chain each
+        time it is asked for.
+
+        :return: list of state tuples, oldest first
+        """
+        game_state = []
+        node = self
+        while node is not None:
+            game_state.append(node.state)
+            node = node._parent
+        game_state.reverse()
+        return game_state
 
     def _calculate_possible_moves(self):
         """
@@ -65,35 +236,24 @@ class BlockConfigurationNode(AbstractNode):
             current node. The node itself should evaluate whether or not it is valid
             when it is created.
 
-        :return: tuple of two lists, where each item in the list represents a move that
-            can be made from a given pile
+        :return: tuple of two tuples, where each item in the tuple represents a move
+            that can be made from a given pile
         """
-        red_count, blue_count = self.total_red_and_blue_count_for_state(self._current_state)
-        pile1 = []
-        pile2 = []
-
-        for red in range(self._num_hands+1):
-            for blue in range(self._num_hands, -1, -1):
-                move_is_possible = (red <= red_count and
-                                    blue <= blue_count and
-                                    red + blue <= self._num_hands and
-                                    not (red == 0 and blue == 0))
+        red_count, blue_count = self.total_red_and_blue_count_for_state(self.state)
+        return move_table(red_count, blue_count, self._num_hands)
 
-                if move_is_possible:
-                    pile1.append(((-red, red), (-blue, blue)))
-                    pile2.append(((red, -red), (blue, -blue)))
-
-        return pile1, pile2
-
-    def _calculate_validity(self, state_tuple):
+    @staticmethod
+    def _calculate_validity(state_tuple):
         """
         Checks that a new node has a valid state.
         NOTE: does not check for states that would be unlikely to be generated using
-        the public methods provided -- for example, mismatched parent and child nodes
+        the public methods provided -- for example, mismatched parent and child nodes.
+        States that were already visited are not rejected here; the search's visited
+        table takes care of that.
 
         :return: boolean, whether node meets the criteria for a valid node
         """
-        pile1, pile2 = self.red_and_blue_counts_for_each_pile(state_tuple)
+        pile1, pile2 = BlockConfigurationNode.red_and_blue_counts_for_each_pile(state_tuple)
         pile1_red, pile1_blue = pile1
         pile2_red, pile2_blue = pile2
 
@@ -104,103 +264,61 @@ class BlockConfigurationNode(AbstractNode):
         # can't have more reds than blues in any pile
         valid_red_vs_blue_count = pile1_red <= pile1_blue and pile2_red <= pile2_blue
 
-        # don't go back through game states that have already been visited
-        non_repeating_game_state = self._game_state.count(state_tuple) <= 1
-
-        return (non_negative_pile_counts and valid_red_vs_blue_count and
-                non_repeating_game_state)
+        return non_negative_pile_counts and valid_red_vs_blue_count
 
 
 
 
 
     def __repr__(self):
-        return os.linesep.join([self._repr_for_state(state) for state in self._game_state])
+        game_state = self._game_state
+        template = row_template_for_state(game_state[0], self._num_hands)
+        return os.linesep.join([template.render(state) for state in game_state])
 
     def _repr_for_state(self, state_tuple):
-        pile_counts = (state_tuple[self.RED_INDEX], state_tuple[self.BLUE_INDEX])
-        total_colors = (sum(pile_counts[0]), sum(pile_counts[1]))
-
-        state_repr = ''
-        for pile_index in (self.PILE1_INDEX, self.PILE2_INDEX):
-            pile_repr = '['
-
-            for color_index in (self.RED_INDEX, self.BLUE_INDEX):
-                color_repr = ''
-
-                for i in range(total_colors[color_index]):
-                    if i < pile_counts[color_index][pile_index]:
-                        color_repr += ['R', 'B'][color_index]
-                    else:
-                        color_repr += ' '
-
-                if color_index == self.RED_INDEX:
-                    separator = ' | '
-                    color_repr += separator
-
-                pile_repr += color_repr
-
-            pile_repr += ']'
-
-            hand_location_repr = ''
-            if pile_index == self.PILE1_INDEX:
-                hands_repr = 'O' * self._num_hands
-                space_repr = ' ' * self._num_hands
-
-                hand_location_repr = ' '
-                if state_tuple[self.HAND_POS_INDEX] == self.PILE1_INDEX:
-                    hand_location_repr += hands_repr + space_repr
-                else:
-                    hand_location_repr += space_repr + hands_repr
-                hand_location_repr += ' '
-
-            state_repr += pile_repr + hand_location_repr
-
-        return state_repr
+        return row_template_for_state(state_tuple, self._num_hands).render(state_tuple)
 
     def __unicode__(self):
         return unicode(repr(self))
 
 
     @staticmethod
-    def red_and_blue_counts_for_each_pile(state_tuple):
+    def red_and_blue_counts_for_each_pile(state_tuple, codec=None):
         """
         Returns the red and blue counts for each pile of a given state tuple
 
-        :param state_tuple: tuple representing a valid node state
+        :param state_tuple: tuple representing a valid node state, or the packed
+                integer for one
+        :param codec: BlockStateCodec the state was packed with; required for packed
+                states
         :return: ((reds in pile1, blues in pile1), (reds in pile2, blues in pile2))
         """
+        if codec is not None:
+            return codec.red_and_blue_counts_for_each_pile(state_tuple)
+
         pile1_red, pile2_red = state_tuple[BlockConfigurationNode.RED_INDEX]
         pile1_blue, pile2_blue = state_tuple[BlockConfigurationNode.BLUE_INDEX]
         return (pile1_red, pile1_blue), (pile2_red, pile2_blue)
 
     @staticmethod
-    def total_red_and_blue_count_for_state(state_tuple):
+    def total_red_and_blue_count_for_state(state_tuple, codec=None):
         """
         Returns the total count of reds, blues for a given state tuple
 
-        :param state_tuple: tuple representing a valid node state
+        :param state_tuple: tuple representing a valid node state, or the packed
+                integer for one
+        :param codec: BlockStateCodec the state was packed with; required for packed
+                states
         :return: (total reds, total blues)
         """
+        if codec is not None:
+            return codec.total_red, codec.total_blue
+
         red_state, blue_state, _ = state_tuple
         return sum(red_state), sum(blue_state)
 
 
 
-    '''
-    def _new_move(self, old_move_tuple, new_move_tuple):
-        raise Exception("Not Updated")
-        move = []
-        move[self.PILE1_INDEX] = old_move_tuple[self.PILE1_INDEX] + new_move_tuple[self.PILE1_INDEX]
-        move[self.PILE2_INDEX] = old_move_tuple[self.PILE2_INDEX] + new_move_tuple[self.PILE2_INDEX]
-        return move
-
-    def _new_child_node(self, new_red_state, new_blue_state, new_hand_location):
-        raise Exception("Not Updated")
-        return BlockConfigurationNode(new_red_state, new_blue_state, new_hand_location,
-                                       self._red, self._blue, self._hands, self)
-    '''
-
     '''
     @classmethod
     def create_state(cls, red_pile1, red_pile2, blue_pile1, blue_pile2, hand_location):
@@ -221,41 +339,617 @@ class BlockConfigurationNode(AbstractNode):
         return state_for_red, state_for_blue, current_hand
     '''
     def is_valid(self):
-        return self._valid
+        return self._is_valid
+
+    def state_key(self):
+        return self._current_state
+
+    def goal_key(self, ending_state):
+        """
+        :param ending_state: tuple representing a node state
+        :return: state key of a node in the same tree in ending_state
+        """
+        if self._codec is None:
+            return ending_state
+        if (self.total_red_and_blue_count_for_state(ending_state) !=
+                (self._codec.total_red, self._codec.total_blue)):
+            # a state from another game, which no packed key can match
+            return ending_state
+        return self._codec.pack(ending_state)
+
+    def mirror_key(self):
+        """
+        The game looks the same with pile 1 and pile 2 swapped, along with the hand
+        position.
+
+        :return: state key of the mirror image of this node's state
+        """
+        if self._codec is not None:
+            return self._codec.mirror(self._current_state)
+        red_state, blue_state, hand_location = self._current_state
+        return ((red_state[self.PILE2_INDEX], red_state[self.PILE1_INDEX]),
+                (blue_state[self.PILE2_INDEX], blue_state[self.PILE1_INDEX]),
+                self.PILE2_INDEX if hand_location == self.PILE1_INDEX else self.PILE1_INDEX)
+
+    def canonical_key(self):
+        """
+        :return: the smaller of the state keys of this node and its mirror image
+        """
+        return min(self._current_state, self.mirror_key())
 
     def generate_child_nodes(self):
-        raise Exception('Not Implemented')
-        child_nodes = []
+        """
+        Applies every legal move from the pile the hands are currently on. Moves that
+        would take more blocks than the pile holds are never tried.
+
+        Children are generated lazily, so a depth-first search can explore the first
+        one before its siblings are created.
 
+        :return: generator of valid child nodes; invalid nodes have no children
+        """
         # we don't want to waste time generating children for invalid nodes
         if self.is_valid():
-            next_hand_loc = self._hand_loc + 1 % self._hands
-            for move in self._allowed_moves:
-                new_move_red = self._new_move(self._state[self.RED_INDEX], move)
-                new_move_blue = self._new_move(self._state[self.BLUE_INDEX], move)
-                new_node = self._new_child_node(new_move_red, new_move_blue, next_hand_loc)
-                child_nodes.append(new_node)
+            red_state, blue_state, hand_location = self.state
+            next_hand_location = (self.PILE2_INDEX if hand_location == self.PILE1_INDEX
+                                  else self.PILE1_INDEX)
+            moves = legal_moves(red_state[hand_location], blue_state[hand_location],
+                                self._num_hands, hand_location)
+            for red_move, blue_move in moves:
+                new_state = ((red_state[0] + red_move[0], red_state[1] + red_move[1]),
+                             (blue_state[0] + blue_move[0], blue_state[1] + blue_move[1]),
+                             next_hand_location)
+                # skip allocating nodes for invalid states
+                if self._calculate_validity(new_state):
+                    yield self._new_child(new_state)
+
+    def candidate_child_count(self):
+        """
+        :return: number of legal moves from the current state, valid or not; 0 for an
+                invalid node
+        """
+        if not self.is_valid():
+            return 0
+        red_state, blue_state, hand_location = self.state
+        return len(legal_moves(red_state[hand_location], blue_state[hand_location],
+                               self._num_hands, hand_location))
+
+    @classmethod
+    def generate_child_nodes_for_level(cls, nodes):
+        """
+        Generates the children of a whole level of nodes from the same game. With NumPy
+        installed, every move is applied to every state in one array operation and the
+        validity rules are evaluated as array masks, so only valid children are turned
+        into nodes. Without NumPy, falls back to generate_child_nodes.
+
+        :param nodes: list of BlockConfigurationNodes sharing block totals and hands
+        :return: list holding a list of children for each node
+        """
+        if numpy is None or not nodes:
+            return super(BlockConfigurationNode, cls).generate_child_nodes_for_level(nodes)
+
+        first_node = nodes[0]
+        red_count, blue_count = cls.total_red_and_blue_count_for_state(first_node.state)
+        # one row per node: red pile1, red pile2, blue pile1, blue pile2, hand location
+        states = numpy.array(
+            [red_state + blue_state + (hand_location,)
+             for red_state, blue_state, hand_location in (node.state for node in nodes)],
+            dtype=numpy.int64)
+        is_valid = numpy.array([node.is_valid() for node in nodes], dtype=bool)
+
+        child_nodes = [[] for _ in nodes]
+        moves_for_piles = move_table(red_count, blue_count, first_node._num_hands)
+        for hand_location, moves in enumerate(moves_for_piles):
+            rows = numpy.nonzero(is_valid & (states[:, 4] == hand_location))[0]
+            if not moves or not len(rows):
+                continue
+
+            move_array = numpy.array([red_move + blue_move for red_move, blue_move in moves],
+                                     dtype=numpy.int64)
+            # shape (rows, moves, 4)
+            new_states = states[rows][:, None, :4] + move_array[None, :, :]
+            valid_states = ((new_states >= 0).all(axis=2) &
+                            (new_states[:, :, 0] <= new_states[:, :, 2]) &
+                            (new_states[:, :, 1] <= new_states[:, :, 3]))
+
+            next_hand_location = 1 - hand_location
+            parent_rows = rows[numpy.nonzero(valid_states)[0]].tolist()
+            for row, new_state in zip(parent_rows, new_states[valid_states].tolist()):
+                pile1_red, pile2_red, pile1_blue, pile2_blue = new_state
+                child_nodes[row].append(nodes[row]._new_child(
+                    ((pile1_red, pile2_red), (pile1_blue, pile2_blue), next_hand_location)))
 
         return child_nodes
 
+    def _new_child(self, new_state):
+        """
+        Creates a child node for a state that is already known to be valid, without
+        checking it again.
+
+        :param new_state: tuple representing the child's state
+        :return: BlockConfigurationNode
+        """
+        node = BlockConfigurationNode.__new__(BlockConfigurationNode)
+        node._parent = self
+        node._codec = self._codec
+        node._current_state = new_state if self._codec is None else self._codec.pack(new_state)
+        node._depth = self._depth + 1
+        node._num_hands = self._num_hands
+        node._is_valid = True
+        return node
+
+    def generate_parent_nodes(self):
+        """
+        Every move can be undone by carrying the same blocks back the other way, so the
+        states that lead to this node are exactly the states it leads to.
+
+        :return: generator of valid nodes one move away, with this node as their parent
+        """
+        return self.generate_child_nodes()
+
+    def detached(self):
+        node = BlockConfigurationNode.__new__(BlockConfigurationNode)
+        for attribute in self.__slots__:
+            setattr(node, attribute, getattr(self, attribute))
+        node._parent = None
+        return node
+
+    def attach(self, parent):
+        self._parent = parent
+
     def fulfills_goal(self, ending_state):
-        raise Exception("Not Updated")
-        return self._state == ending_state
+        return self.state == ending_state
+
+    def path_cost(self):
+        return self._depth
+
+    def heuristic(self, ending_state):
+        """
+        Lower bound on the number of moves needed to reach ending_state. The bound
+        comes from a relaxed game where block colours are ignored: each trip away from
+        a pile carries at most num_hands blocks, and each trip back carries at least
+        one, so only the number of blocks that has to change piles matters.
+
+        :param ending_state: tuple representing the goal state
+        :return: integer
+        """
+        (pile1_red, _), (pile1_blue, _), hand_location = self.state
+        (goal_red, _), (goal_blue, _), goal_hand_location = ending_state
+        blocks_to_move = pile1_red + pile1_blue - goal_red - goal_blue
+
+        # with nothing to move, either pile can be treated as the source
+        estimate = 0
+        if blocks_to_move >= 0:
+            estimate = self._relaxed_move_count(
+                blocks_to_move, hand_location == self.PILE1_INDEX,
+                goal_hand_location == self.PILE1_INDEX)
+        if blocks_to_move <= 0:
+            estimate = max(estimate, self._relaxed_move_count(
+                -blocks_to_move, hand_location == self.PILE2_INDEX,
+                goal_hand_location == self.PILE2_INDEX))
+        return estimate
+
+    def _relaxed_move_count(self, num_blocks, starts_on_source, ends_on_source):
+        """
+        Fewest moves that shift num_blocks (ignoring colour) from a source pile to the
+        other pile, with the hands starting and ending on the given sides.
+
+        :return: integer
+        """
+        # trips away from the source minus trips back to it
+        trip_difference = int(starts_on_source) - int(ends_on_source)
+        trips_away = max(trip_difference, 0)
+        if self._num_hands > 1:
+            # trips_away * hands - trips_back >= num_blocks >= trips_away - trips_back * hands
+            spare = max(num_blocks - trip_difference,
+                        self._num_hands * trip_difference - num_blocks)
+            trips_away = max(trips_away, -(-spare // (self._num_hands - 1)))
+        return 2 * trips_away - trip_difference
+
+
+def packed_successors(codec, num_hands):
+    """
+    Move generation for searches that work on packed states directly, without nodes.
+
+    :param codec: BlockStateCodec for the game
+    :param num_hands: integer, number of hands available to move blocks
+    :return: function taking a packed state and returning a list of the packed valid
+            states one move away
+    """
+    is_valid = BlockConfigurationNode._calculate_validity
+
+    def successors(packed_state):
+        red_state, blue_state, hand_location = codec.unpack(packed_state)
+        next_hand_location = 1 - hand_location
+        states = []
+        for red_move, blue_move in legal_moves(red_state[hand_location],
+                                               blue_state[hand_location], num_hands,
+                                               hand_location):
+            state_tuple = ((red_state[0] + red_move[0], red_state[1] + red_move[1]),
+                           (blue_state[0] + blue_move[0], blue_state[1] + blue_move[1]),
+                           next_hand_location)
+            if is_valid(state_tuple):
+                states.append(codec.pack(state_tuple))
+        return states
+
+    return successors
+
+
+class BlockDistanceTable(object):
+    """
+    Number of moves from every state of one block game to a single goal state, along
+    with the next state on a shortest path.
+
+    Built by one breadth-first search backwards from the goal. Every move can be
+    undone, so the states one move before a state are the states one move after it.
+    States are indexed by their BlockStateCodec packing, so both tables are flat
+    integer arrays with one entry per state. After that, looking up a state's distance
+    takes constant time and reading off its path takes time proportional to its length.
+    """
+
+    __slots__ = ('goal_state', 'num_hands', 'codec', '_distances', '_next_states')
+
+    UNREACHABLE = -1
+
+    def __init__(self, goal_state, num_hands=2):
+        """
+        :param goal_state: tuple representing a valid node state
+        :param num_hands: integer, number of hands available to move blocks
+        """
+        self.goal_state = goal_state
+        self.num_hands = num_hands
+        self.codec = BlockStateCodec.for_state(goal_state)
+        self._distances = array('i', [self.UNREACHABLE]) * self.codec.size
+        self._next_states = array('i', [self.UNREACHABLE]) * self.codec.size
+        self._fill()
+
+    def _fill(self):
+        codec = self.codec
+        distances = self._distances
+        next_states = self._next_states
+        if not BlockConfigurationNode(self.goal_state, num_hands=self.num_hands).is_valid():
+            return
+
+        successors = packed_successors(codec, self.num_hands)
+        goal = codec.pack(self.goal_state)
+        distances[goal] = 0
+        level = [goal]
+        distance = 0
+        while level:
+            distance += 1
+            next_level = []
+            for packed_state in level:
+                for previous_state in successors(packed_state):
+                    if distances[previous_state] != self.UNREACHABLE:
+                        continue
+                    distances[previous_state] = distance
+                    next_states[previous_state] = packed_state
+                    next_level.append(previous_state)
+            level = next_level
+
+    def _index(self, state_tuple):
+        """
+        :return: packed state, or None if the state does not belong to this game
+        """
+        if (BlockConfigurationNode.total_red_and_blue_count_for_state(state_tuple) !=
+                (self.codec.total_red, self.codec.total_blue)):
+            return None
+        if min(min(state_tuple[0]), min(state_tuple[1])) < 0:
+            return None
+        if state_tuple[BlockConfigurationNode.HAND_POS_INDEX] not in (
+                BlockConfigurationNode.PILE1_INDEX, BlockConfigurationNode.PILE2_INDEX):
+            return None
+        return self.codec.pack(state_tuple)
+
+    def distance(self, state_tuple):
+        """
+        :param state_tuple: tuple representing a node state
+        :return: integer, number of moves on a shortest path to the goal, or None if the
+                goal can't be reached from the state
+        """
+        packed_state = self._index(state_tuple)
+        if packed_state is None or self._distances[packed_state] == self.UNREACHABLE:
+            return None
+        return self._distances[packed_state]
+
+    def path(self, state_tuple):
+        """
+        :param state_tuple: tuple representing a node state
+        :return: list of state tuples from state_tuple to the goal, or None if the goal
+                can't be reached from the state
+        """
+        if self.distance(state_tuple) is None:
+            return None
+        packed_state = self.codec.pack(state_tuple)
+        path = [state_tuple]
+        while self._next_states[packed_state] != self.UNREACHABLE:
+            packed_state = self._next_states[packed_state]
+            path.append(self.codec.unpack(packed_state))
+        return path
+
+    def final_node(self, state_tuple, compact=False):
+        """
+        Same answer a search from state_tuple would give, without the search
+
+        :param state_tuple: tuple representing a node state
+        :param compact: boolean, whether nodes store packed integer states
+        :return: BlockConfigurationNode for the goal whose ancestors follow a shortest
+                path from state_tuple, or None if the goal can't be reached
+        """
+        path = self.path(state_tuple)
+        if path is None:
+            return None
+        node = BlockConfigurationNode(path[0], num_hands=self.num_hands, compact=compact)
+        for state in path[1:]:
+            node = node._new_child(state)
+        return node
+
+
+# Number of distance tables kept by distance_table, one for each game asked about
+DISTANCE_TABLE_CACHE_SIZE = 32
+
+
+@lru_cache(maxsize=DISTANCE_TABLE_CACHE_SIZE)
+def distance_table(num_red_blocks, num_blue_blocks, num_hands):
+    """
+    BlockDistanceTable towards the usual goal of every block on pile 2, cached so that
+    repeated questions about the same game only pay for it once.
+
+    :return: BlockDistanceTable
+    """
+    return BlockDistanceTable(((0, num_red_blocks), (0, num_blue_blocks), 1), num_hands)
+
 
-'''
 class BlockGameSolver(AbstractSearch):
     """
-    TODO: write docs
+    Solves the block game of moving every block from pile 1 to pile 2, with any of the
+    AbstractSearch algorithms, or with a cached BlockDistanceTable.
+
+    Successful searches return the list of states from the starting state to the goal.
     """
 
-    def __init__(self, num_red_blocks, num_blue_blocks, num_hands):
+    ALGORITHMS = (
+        'depth_first',
+        'breadth_first',
+        'iterative_deepening',
+        'greedy_best_first',
+        'a_star',
+        'bidirectional',
+        'breadth_first_to_mirror',
+        'distance_table',
+    )
+
+    def __init__(self, num_red_blocks, num_blue_blocks, num_hands, **search_options):
+        """
+        :param num_red_blocks: integer, number of red blocks in the game
+        :param num_blue_blocks: integer, number of blue blocks in the game
+        :param num_hands: integer, number of hands available to move blocks
+        :param search_options: budgets and other keyword arguments for AbstractSearch
+        """
+        super(BlockGameSolver, self).__init__(**search_options)
         self._red = num_red_blocks
         self._blue = num_blue_blocks
         self._hands = num_hands
 
-        self.paths
-'''
+    @property
+    def starting_state(self):
+        return (self._red, 0), (self._blue, 0), BlockConfigurationNode.PILE1_INDEX
 
-if __name__ == '__main__':
-    pass
+    @property
+    def goal(self):
+        return (0, self._red), (0, self._blue), BlockConfigurationNode.PILE2_INDEX
+
+    def solve(self, algorithm='breadth_first'):
+        """
+        :param algorithm: string, one of ALGORITHMS
+        :return: list of states from the starting state to the goal; None if there is
+                no solution; BudgetExhausted if a budget ran out first
+        """
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError('unknown algorithm {0!r}'.format(algorithm))
+
+        if algorithm == 'distance_table':
+            return distance_table(self._red, self._blue, self._hands).path(
+                self.starting_state)
+
+        starting_node = BlockConfigurationNode(self.starting_state, num_hands=self._hands)
+        if algorithm == 'bidirectional':
+            goal_node = BlockConfigurationNode(self.goal, num_hands=self._hands)
+            return self.bidirectional(starting_node, goal_node)
+        elif algorithm == 'breadth_first_to_mirror':
+            # the goal is the starting state with the piles and hands swapped
+            return self.breadth_first_to_mirror(starting_node)
+        return getattr(self, algorithm)(starting_node, self.goal)
+
+    def _return_result(self, final_node, is_success):
+        return final_node._game_state if is_success else None
+
+
+def parse_job(line):
+    """
+    Reads one job of the batch solver, either as a JSON object with num_red_blocks,
+    num_blue_blocks, num_hands and optionally algorithm, or as whitespace-separated
+    'reds blues hands [algorithm]'.
+
+    :param line: string
+    :return: dictionary, or None for blank lines and # comments
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    if line.startswith('{'):
+        fields = json.loads(line)
+    else:
+        parts = line.split()
+        if len(parts) not in (3, 4):
+            raise ValueError('expected "reds blues hands [algorithm]", got {0!r}'.format(line))
+        fields = dict(zip(('num_red_blocks', 'num_blue_blocks', 'num_hands', 'algorithm'),
+                          parts))
+
+    job = {}
+    for name in ('num_red_blocks', 'num_blue_blocks', 'num_hands'):
+        if name not in fields:
+            raise ValueError('missing {0}'.format(name))
+        value = fields[name]
+        if isinstance(value, str):
+            value = int(value)
+        elif isinstance(value, bool) or not isinstance(value, int):
+            # JSON floats, booleans, null, lists and objects
+            raise ValueError('{0} must be an integer, got {1!r}'.format(name, value))
+        if value < 0:
+            raise ValueError('{0} must not be negative, got {1}'.format(name, value))
+        job[name] = value
+    job['algorithm'] = fields.get('algorithm', 'breadth_first')
+    if job['algorithm'] not in BlockGameSolver.ALGORITHMS:
+        raise ValueError('unknown algorithm {0!r}'.format(job['algorithm']))
+    return job
+
+
+def solve_job(job, search_options=None, include_path=True, cache=None):
+    """
+    Solves one job of the batch solver. Runs in the worker processes, so it has to be a
+    module-level function.
+
+    :param job: dictionary returned by parse_job
+    :param search_options: dictionary of keyword arguments for AbstractSearch
+    :param include_path: boolean, whether to include the list of states in the result
+    :param cache: SolutionCache to look the job up in first and store its result in;
+            search stats are always collected when given
+    :return: dictionary of the job's fields plus outcome, moves, seconds, path and, if
+            collected, stats
+    """
+    search_options = dict(search_options or {})
+    if cache is not None:
+        search_options['collect_stats'] = True
+    solver = BlockGameSolver(job['num_red_blocks'], job['num_blue_blocks'], job['num_hands'],
+                             **search_options)
+    cache_key = (job['num_red_blocks'], job['num_blue_blocks'], job['num_hands'],
+                 solver.starting_state, solver.goal, job['algorithm'])
+    result = dict(job)
+    started_at = time.perf_counter()
+
+    cached = cache.get(*cache_key) if cache is not None else None
+    if cached is not None:
+        path = cached['path']
+        result['outcome'] = cached['outcome']
+        if cached['stats'] is not None:
+            result['stats'] = cached['stats']
+        result['cached'] = True
+    else:
+        path = solver.solve(job['algorithm'])
+        if isinstance(path, BudgetExhausted):
+            result['outcome'] = 'budget_exhausted'
+            result['reason'] = path.reason
+            path = None
+        else:
+            result['outcome'] = 'solved' if path is not None else 'no_solution'
+        if solver.last_stats is not None:
+            result['stats'] = vars(solver.last_stats)
+        # a budget running out says nothing about the game, only about the budget
+        if cache is not None and result['outcome'] != 'budget_exhausted':
+            cache.put(*cache_key, outcome=result['outcome'], path=path,
+                      stats=result.get('stats'))
+
+    result['seconds'] = time.perf_counter() - started_at
+    result['moves'] = len(path) - 1 if path is not None else None
+    if include_path:
+        result['path'] = path
+    return result
+
+
+def iter_results(lines, workers=1, search_options=None, include_path=True, cache=None):
+    """
+    Solves a stream of jobs, yielding each result as soon as it is ready. With more than
+    one worker, results can come out of order; each one carries the number of the line
+    its job was read from. Lines that can't be parsed give a result with an error.
+
+    :param lines: iterable of strings, see parse_job
+    :param workers: integer, number of worker processes; with 1, jobs are solved in
+            this process, one after the other
+    :param search_options: dictionary of keyword arguments for AbstractSearch
+    :param include_path: boolean, whether to include the list of states in the results
+    :param cache: SolutionCache shared by every worker, or None
+    :return: generator of dictionaries
+    """
+    def jobs():
+        for line_number, line in enumerate(lines, 1):
+            try:
+                job = parse_job(line)
+            except ValueError as error:
+                yield line_number, None, str(error)
+                continue
+            if job is not None:
+                yield line_number, job, None
+
+    def labelled(line_number, result):
+        result['line'] = line_number
+        return result
+
+    if workers == 1:
+        for line_number, job, error in jobs():
+            if error is not None:
+                yield {'line': line_number, 'error': error}
+            else:
+                yield labelled(line_number, solve_job(job, search_options, include_path, cache))
+        return
+
+    # only a few jobs per worker are queued at a time, so jobs are read as the results
+    # stream out rather than all up front
+    max_pending = workers * 4
+    executor = ProcessPoolExecutor(workers)
+    try:
+        pending = {}
+        for line_number, job, error in jobs():
+            if error is not None:
+                yield {'line': line_number, 'error': error}
+                continue
+            pending[executor.submit(solve_job, job, search_options, include_path,
+                                    cache)] = line_number
+            while len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield labelled(pending.pop(future), future.result())
+        for future in as_completed(pending):
+            yield labelled(pending[future], future.result())
+    finally:
+        executor.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Solves a batch of block games, printing one JSON result per line.')
+    parser.add_argument('jobs', nargs='?', default='-',
+                        help='file of jobs, one per line as JSON or "reds blues hands '
+                             '[algorithm]" (default: standard input)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes (default: 1)')
+    parser.add_argument('--max-nodes', type=int, help='node budget for each search')
+    parser.add_argument('--time-limit', type=float, help='seconds allowed for each search')
+    parser.add_argument('--no-path', action='store_true',
+                        help='leave the list of states out of the results')
+    parser.add_argument('--stats', action='store_true',
+                        help='include search stats in the results')
+    parser.add_argument('--cache', help='SQLite file to keep solutions in across runs')
+    parser.add_argument('--cache-size', type=int,
+                        help='maximum number of solutions kept in the cache')
+    args = parser.parse_args(argv)
+
+    search_options = {'max_nodes': args.max_nodes, 'time_limit': args.time_limit,
+                      'collect_stats': args.stats}
+    cache = SolutionCache(args.cache, args.cache_size) if args.cache else None
+    jobs_file = sys.stdin if args.jobs == '-' else open(args.jobs)
+    try:
+        for result in iter_results(jobs_file, args.workers, search_options,
+                                   not args.no_path, cache):
+            sys.stdout.write(json.dumps(result) + '\n')
+            sys.stdout.flush()
+    finally:
+        if jobs_file is not sys.stdin:
+            jobs_file.close()
+        if cache is not None:
+            cache.close()
+    return 0
 
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,17 @@
 """
-Implements the depth-first and breadth-first algorithms described on pg. 33
+Implements the depth-first and breadth-first algorithms described on pg. 33, along
+with heuristic (best-first and A*) searches over the same nodes
 """
+import asyncio
+import functools
+import heapq
+import itertools
+import os
+import threading
+import time
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
 
 
 class AbstractNode(object):
@@ -14,13 +24,16 @@ class AbstractNode(object):
     """
 
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractmethod
     def generate_child_nodes(self):
         """
-        Generate a list of child nodes to be explored in the problem space.
+        Generate the child nodes to be explored in the problem space. May be a
+        generator, in which case depth-first search only creates each child when it
+        gets to it.
 
-        :return: list of nodes
+        :return: iterable of nodes
         """
         pass
 
@@ -34,6 +47,448 @@ class AbstractNode(object):
         """
         pass
 
+    def state_key(self):
+        """
+        Hashable value identifying the state the node represents. Two nodes with the
+        same key are treated as the same configuration by the search, so only the
+        first one reached is expanded.
+
+        By default every node is its own state; override to enable duplicate detection.
+
+        :return: hashable object
+        """
+        return self
+
+    @classmethod
+    def generate_child_nodes_for_level(cls, nodes):
+        """
+        Generates the children of many nodes at once. Used by the level-by-level
+        parallel_breadth_first; override when children can be generated faster in bulk
+        than one node at a time.
+
+        :param nodes: list of nodes of this class
+        :return: list holding a list of children for each node
+        """
+        return [list(node.generate_child_nodes()) for node in nodes]
+
+    def generate_parent_nodes(self):
+        """
+        Generates the nodes from which this node can be reached in a single step.
+        Needed by bidirectional search, which walks backwards from the goal; the
+        returned nodes only have to share state_key() with the real predecessors.
+
+        :return: iterable of nodes
+        """
+        raise NotImplementedError
+
+    def detached(self):
+        """
+        Copy of this node without its ancestry, which is cheap to send to another
+        process. Needed by parallel_breadth_first; the node must also be picklable.
+
+        :return: node
+        """
+        raise NotImplementedError
+
+    def attach(self, parent):
+        """
+        Makes parent the parent of a detached node, once it is back in the process that
+        owns the search tree. Needed by parallel_breadth_first.
+
+        :param parent: node that generated this node
+        """
+        raise NotImplementedError
+
+    def heuristic(self, goal):
+        """
+        Estimates the cost of reaching the goal from this node. Needed by the
+        best-first searches; a_star only returns optimal paths if the estimate never
+        exceeds the real cost.
+
+        :param goal: object representing the desired end state
+        :return: number
+        """
+        raise NotImplementedError
+
+    def path_cost(self):
+        """
+        Cost of the path from the starting node to this node. Needed by a_star.
+
+        :return: number
+        """
+        raise NotImplementedError
+
+    def goal_key(self, goal):
+        """
+        state_key() that a node in the same search as this one has when it fulfills
+        goal. Used by breadth_first_to_goals to look goals up in a dictionary instead
+        of calling fulfills_goal once per goal.
+
+        By default goals are state keys already.
+
+        :param goal: object representing a desired end state
+        :return: hashable object
+        """
+        return goal
+
+    def mirror_key(self):
+        """
+        state_key() of the mirror image of this node under a symmetry of the problem,
+        such that the moves out of the mirror image are the mirror images of the moves
+        out of this node. Needed by breadth_first_to_mirror.
+
+        :return: hashable object
+        """
+        raise NotImplementedError
+
+    def canonical_key(self):
+        """
+        Key shared by this node and its mirror image, used by breadth_first_to_mirror
+        to detect repeated states, so that mirrored configurations are only explored
+        once. Must be consistent with mirror_key.
+
+        :return: hashable object
+        """
+        return self.state_key()
+
+    def candidate_child_count(self):
+        """
+        Number of children generate_child_nodes considered before dropping invalid
+        ones. Only used to fill in SearchStats.invalid_discarded.
+
+        :return: integer, or None if unknown
+        """
+        return None
+
+
+class AbstractFrontier(object):
+    """
+    Base class for the containers holding the nodes that are still pending in a
+    search. AbstractSearch._search only ever talks to the frontier through push/pop,
+    so each implementation decides the order in which nodes get explored.
+
+    Should implement the following methods:
+        push
+        pop
+        __len__
+    """
+
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def push(self, node):
+        """
+        Adds a node to the frontier
+
+        :param node: node object waiting to be explored
+        """
+        pass
+
+    @abstractmethod
+    def pop(self):
+        """
+        Removes the next node to explore from the frontier
+
+        :return: node object
+        """
+        pass
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+    def extend(self, nodes):
+        """
+        Adds the children of a node to the frontier, in the order they were generated
+
+        :param nodes: iterable of node objects
+        """
+        for node in nodes:
+            self.push(node)
+
+
+class StackFrontier(AbstractFrontier):
+    """
+    Last-in, first-out frontier used by depth-first search.
+
+    extend keeps hold of the iterable of children instead of copying it, and only
+    takes the next child out of it once everything pushed after that child has been
+    popped. With lazily generated children, depth-first search descends into the first
+    child without generating its siblings. __len__ counts each group of pending
+    siblings once.
+    """
+
+    # marks a stack entry whose next node has not been taken out of its iterator yet
+    _PENDING = object()
+
+    def __init__(self):
+        # entries are [next node, iterator over the nodes after it, or None]
+        self._entries = []
+
+    def push(self, node):
+        self._entries.append([node, None])
+
+    def pop(self):
+        self._fill_top()
+        entry = self._entries[-1]
+        node = entry[0]
+        if entry[1] is None:
+            self._entries.pop()
+        else:
+            entry[0] = self._PENDING
+        return node
+
+    def __len__(self):
+        self._fill_top()
+        return len(self._entries)
+
+    def extend(self, nodes):
+        # the first child generated is the first one explored, matching
+        # expand(current) + pending
+        iterator = iter(nodes)
+        node = next(iterator, self._PENDING)
+        if node is not self._PENDING:
+            self._entries.append([node, iterator])
+
+    def _fill_top(self):
+        """
+        Takes the next node out of the iterator on top of the stack, if it is needed,
+        dropping any iterators that have run out
+        """
+        entries = self._entries
+        while entries and entries[-1][0] is self._PENDING:
+            node = next(entries[-1][1], self._PENDING)
+            if node is self._PENDING:
+                entries.pop()
+            else:
+                entries[-1][0] = node
+
+
+class QueueFrontier(AbstractFrontier):
+    """
+    First-in, first-out frontier used by breadth-first search
+    """
+
+    def __init__(self):
+        self._nodes = deque()
+
+    def push(self, node):
+        self._nodes.append(node)
+
+    def pop(self):
+        return self._nodes.popleft()
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def extend(self, nodes):
+        self._nodes.extend(nodes)
+
+
+class PriorityFrontier(AbstractFrontier):
+    """
+    Frontier that always returns the node with the lowest priority value. Nodes with
+    equal priority come out in the order they were pushed.
+    """
+
+    def __init__(self, priority_function):
+        """
+        :param priority_function: function taking a node and returning a value that
+                can be compared with <
+        """
+        self._priority = priority_function
+        self._heap = []
+        self._counter = itertools.count()
+
+    def push(self, node):
+        heapq.heappush(self._heap, (self._priority(node), next(self._counter), node))
+
+    def pop(self):
+        return heapq.heappop(self._heap)[-1]
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class VisitedTable(object):
+    """
+    Search-wide closed set of the state keys that have already been reached.
+
+    Unbounded by default. When max_size is given, the table keeps at most that many
+    keys and evicts the least recently seen one to make room; an evicted state may be
+    expanded again if the search reaches it a second time.
+
+    With track_depth=True the table also keeps the shallowest depth each state was
+    reached at, and a state reached again at a shallower depth counts as new. Searches
+    with a depth limit need this when they can reach a state deep in the tree before
+    reaching it by a shorter path.
+    """
+
+    def __init__(self, max_size=None, track_depth=False):
+        """
+        :param max_size: integer, maximum number of keys to hold; None for no limit
+        :param track_depth: boolean, whether to keep the depth each key was reached at
+        """
+        self._max_size = max_size
+        self._track_depth = track_depth
+        if max_size is not None:
+            self._keys = OrderedDict()
+        else:
+            self._keys = {} if track_depth else set()
+        self.evictions = 0
+
+    def add(self, key, depth=0):
+        """
+        Records a state key
+
+        :param key: hashable state key
+        :param depth: integer, depth the state was reached at; only used when tracking
+                depths
+        :return: True, if the key had not been seen before, or only deeper than depth
+                when tracking depths; False otherwise
+        """
+        keys = self._keys
+        if key in keys:
+            if self._max_size is not None:
+                keys.move_to_end(key)
+            if not self._track_depth or keys[key] <= depth:
+                return False
+            keys[key] = depth
+            return True
+
+        if self._max_size is None:
+            if self._track_depth:
+                keys[key] = depth
+            else:
+                keys.add(key)
+        else:
+            keys[key] = depth
+            if len(keys) > self._max_size:
+                keys.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class SearchStats(object):
+    """
+    Counts and timings for a single run of a search. Only collected when the search
+    was created with collect_stats=True or hooks.
+
+    expand_time and goal_test_time are the seconds spent inside generate_child_nodes
+    (or generate_parent_nodes) and fulfills_goal. invalid_discarded is only counted for
+    nodes that implement candidate_child_count.
+    """
+
+    def __init__(self):
+        self.nodes_expanded = 0
+        self.nodes_generated = 0
+        self.duplicates_pruned = 0
+        self.invalid_discarded = 0
+        self.states_visited = 0
+        self.evictions = 0
+        self.max_frontier = 0
+        self.max_depth = 0
+        self.expand_time = 0.0
+        self.goal_test_time = 0.0
+
+    def __repr__(self):
+        return ('SearchStats(expanded={0}, generated={1}, pruned={2}, invalid={3}, '
+                'visited={4}, evictions={5}, max_frontier={6}, max_depth={7}, '
+                'expand_time={8:.6f}, goal_test_time={9:.6f})'.format(
+                    self.nodes_expanded, self.nodes_generated, self.duplicates_pruned,
+                    self.invalid_discarded, self.states_visited, self.evictions,
+                    self.max_frontier, self.max_depth, self.expand_time,
+                    self.goal_test_time))
+
+
+class SearchHooks(object):
+    """
+    Callbacks run by a search as it works. Subclass and override the ones needed; the
+    defaults do nothing. Hooks run in the process that owns the search, also for
+    parallel_breadth_first.
+    """
+
+    def on_goal_test(self, node, is_goal):
+        """
+        :param node: node that was compared against the goal
+        :param is_goal: boolean, result of node.fulfills_goal
+        """
+        pass
+
+    def on_expand(self, node, child_nodes, depth):
+        """
+        :param node: node whose children were generated
+        :param child_nodes: list of the children
+        :param depth: integer, number of steps from the starting node to node
+        """
+        pass
+
+    def on_prune(self, node):
+        """
+        :param node: generated node that was dropped because its state was already
+                reached
+        """
+        pass
+
+
+class SearchProgress(object):
+    """
+    Snapshot of a running search, handed to the on_progress callback of search_async
+    """
+
+    __slots__ = ('node', 'depth', 'frontier_size', 'nodes_expanded')
+
+    def __init__(self, node, depth, frontier_size, nodes_expanded):
+        """
+        :param node: node about to be expanded
+        :param depth: integer, number of steps from the starting node to node
+        :param frontier_size: integer, number of nodes waiting to be explored
+        :param nodes_expanded: integer, number of nodes expanded so far
+        """
+        self.node = node
+        self.depth = depth
+        self.frontier_size = frontier_size
+        self.nodes_expanded = nodes_expanded
+
+    def __repr__(self):
+        return 'SearchProgress(depth={0}, frontier_size={1}, nodes_expanded={2})'.format(
+            self.depth, self.frontier_size, self.nodes_expanded)
+
+
+class BudgetExhausted(object):
+    """
+    Result of a search that was stopped by one of its limits before it could either
+    find the goal or rule it out. Evaluates as False, like a failed search, but can be
+    told apart with isinstance.
+    """
+
+    MAX_NODES = 'max_nodes'
+    MAX_DEPTH = 'max_depth'
+    TIME_LIMIT = 'time_limit'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, reason, final_node):
+        """
+        :param reason: one of MAX_NODES, MAX_DEPTH, TIME_LIMIT or CANCELLED
+        :param final_node: last node the search looked at
+        """
+        self.reason = reason
+        self.final_node = final_node
+
+    def __bool__(self):
+        return False
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return 'BudgetExhausted({0!r})'.format(self.reason)
+
 
 class AbstractSearch(object):
     """
@@ -42,8 +497,43 @@ class AbstractSearch(object):
     Should implement the following methods:
 
         _return_result
+
+    Every search keeps a VisitedTable of node.state_key() values, so a configuration
+    reached along several paths is only expanded once.
+
+    The max_nodes, max_depth and time_limit budgets apply to every search mode. A
+    search that runs out of budget returns the result of _return_budget_exhausted.
+
+    With collect_stats=True, or when hooks are given, the counts and timings for the
+    most recent search are available afterwards as last_stats; otherwise last_stats is
+    None and the search loops skip the bookkeeping altogether.
+
+    Most search modes are written as step generators that can pause every so many
+    expansions, which lets search_async run them inside an asyncio event loop without
+    blocking it. run_in_executor runs any mode on an executor instead.
     """
 
+    def __init__(self, max_visited=None, max_nodes=None, max_depth=None,
+                 time_limit=None, collect_stats=False, hooks=None):
+        """
+        :param max_visited: integer, maximum number of states held in the visited
+                table (least recently seen states are evicted first); None for no limit
+        :param max_nodes: integer, maximum number of nodes to expand; None for no limit
+        :param max_depth: integer, nodes deeper than this many steps from the starting
+                node are not explored; None for no limit
+        :param time_limit: number of seconds after which the search gives up; None for
+                no limit
+        :param collect_stats: boolean, whether to fill in a SearchStats for every search
+        :param hooks: SearchHooks to call during every search; implies collect_stats
+        """
+        self._max_visited = max_visited
+        self._max_nodes = max_nodes
+        self._max_depth = max_depth
+        self._time_limit = time_limit
+        self._collect_stats = collect_stats or hooks is not None
+        self._hooks = hooks
+        self.last_stats = None
+
     def depth_first(self, starting_node, goal):
         """
         Does a depth-first search of nodes
@@ -53,9 +543,105 @@ class AbstractSearch(object):
         :return: dependent on the implementation of _return_result
 
         Word of caution: this algorithm can potentially run infinitely if the problem
-            space is has branches that are infinitely deep without returning a solution
+            space is has branches that are infinitely deep without returning a solution,
+            unless one of the search budgets is set
         """
-        return self._search(starting_node, goal, self._generate_depth_first_queue)
+        return self._search(starting_node, goal, StackFrontier())
+
+    def iterative_deepening(self, starting_node, goal):
+        """
+        Does a series of depth-first searches, each allowed to go one step deeper than
+        the last. Like breadth_first it finds a shortest path, but only ever holds the
+        current path in memory. States are only checked against the current path, not
+        a visited table, so shallow parts of the tree are explored again on every pass.
+
+        :param starting_node: node object for the beginning state of the search
+        :param goal: object representing the desired end state
+        :return: dependent on the implementation of _return_result
+        """
+        return self._run_steps(self._iterative_deepening_steps(starting_node, goal))
+
+    def _iterative_deepening_steps(self, starting_node, goal, yield_every=None):
+        stats = self._start_stats()
+        # [nodes expanded over all passes, time the search started]
+        progress = [0, time.monotonic()]
+
+        depth_limit = 0
+        while True:
+            final_node, outcome = yield from self._depth_limited_search(
+                starting_node, goal, depth_limit, stats, progress, yield_every)
+            if outcome is True:
+                return self._return_result(final_node, True)
+            elif outcome is False:
+                return self._return_result(final_node, False)
+            elif outcome != BudgetExhausted.MAX_DEPTH:
+                return self._return_budget_exhausted(final_node, outcome)
+            elif self._max_depth is not None and depth_limit >= self._max_depth:
+                return self._return_budget_exhausted(final_node, outcome)
+            depth_limit += 1
+
+    def _depth_limited_search(self, starting_node, goal, depth_limit, stats, progress,
+                              yield_every):
+        """
+        One pass of iterative_deepening; a step generator, see _run_steps
+
+        :param progress: list of [nodes expanded so far, time the search started],
+                updated as the pass expands nodes
+        :return: (last node looked at, True if it fulfills the goal, False if the whole
+                space was searched, or the BudgetExhausted reason the pass stopped for;
+                MAX_DEPTH means some nodes were left unexplored at depth_limit)
+        """
+        if self._goal_test(starting_node, goal, stats):
+            return starting_node, True
+        if depth_limit == 0:
+            return starting_node, BudgetExhausted.MAX_DEPTH
+        limit = self._exceeded_limit(progress[0], progress[1])
+        if limit is not None:
+            return starting_node, limit
+
+        cut_off = False
+        path = [starting_node]
+        path_keys = set([starting_node.state_key()])
+        children = [iter(self._expand(starting_node, 0, stats))]
+        progress[0] += 1
+        while children:
+            child_node = next(children[-1], None)
+            if child_node is None:
+                children.pop()
+                path_keys.discard(path.pop().state_key())
+                continue
+
+            key = child_node.state_key()
+            if key in path_keys:
+                if stats is not None:
+                    self._prune(child_node, stats)
+                continue
+            if stats is None:
+                is_goal = child_node.fulfills_goal(goal)
+            else:
+                is_goal = self._goal_test(child_node, goal, stats)
+            if is_goal:
+                return child_node, True
+            if len(path) >= depth_limit:
+                cut_off = True
+                continue
+
+            limit = self._exceeded_limit(progress[0], progress[1])
+            if limit is not None:
+                return child_node, limit
+            if yield_every is not None and progress[0] % yield_every == 0:
+                yield SearchProgress(child_node, len(path), len(path), progress[0])
+            path.append(child_node)
+            path_keys.add(key)
+            if stats is None:
+                children.append(iter(child_node.generate_child_nodes()))
+            else:
+                children.append(iter(self._expand(child_node, len(path) - 1, stats)))
+                if len(path) > stats.max_frontier:
+                    stats.max_frontier = len(path)
+            progress[0] += 1
+
+        return starting_node, BudgetExhausted.MAX_DEPTH if cut_off else False
 
     def breadth_first(self, starting_node, goal):
         """
@@ -65,39 +651,918 @@ class AbstractSearch(object):
         :param goal: object representing the desired end state
         :return: dependent on the implementation of _return_result
         """
-        return self._search(starting_node, goal, self._generate_breadth_first_queue)
+        return self._search(starting_node, goal, QueueFrontier())
 
-    def _generate_depth_first_queue(self, current_node, pending_nodes):
-        return current_node.generate_child_nodes() + pending_nodes
+    def parallel_breadth_first(self, starting_node, goal, workers=None, chunk_size=None):
+        """
+        Does a breadth-first search one level at a time, splitting the nodes of each
+        level between a pool of worker processes that generate their children. The
+        children are deduplicated and goal-tested in order back in this process, so the
+        result is the same as breadth_first's.
+
+        Nodes must implement detached and attach. Only worth it when generating
+        children is expensive compared to sending nodes between processes. The
+        max_nodes and time_limit budgets are checked before each node's children are
+        used, though the workers may already have generated the children of the rest of
+        that node's chunk. Children are
+        generated with generate_child_nodes_for_level, so workers=1 is also the way to
+        run a breadth-first search with bulk child generation in a single process.
 
-    def _generate_breadth_first_queue(self, current_node, pending_nodes):
-        return pending_nodes + current_node.generate_child_nodes()
+        When collecting stats, expand_time is the time spent waiting for each level's
+        children, including sending nodes to and from the workers.
 
-    def _search(self, starting_node, goal, queue_expansion_function):
+        :param starting_node: node object for the beginning state of the search
+        :param goal: object representing the desired end state
+        :param workers: integer, number of worker processes; defaults to the number of
+                CPUs. With 1, children are generated in this process.
+        :param chunk_size: integer, number of nodes sent to a worker at a time;
+                defaults to splitting each level into four chunks per worker
+        :return: dependent on the implementation of _return_result
         """
+        if workers == 1:
+            return self._level_synchronous_search(starting_node, goal, map, 1, chunk_size,
+                                                  detach=False)
+
+        workers = workers or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(workers)
+        try:
+            return self._level_synchronous_search(starting_node, goal, executor.map, workers,
+                                                  chunk_size, detach=True)
+        finally:
+            executor.shutdown()
+
+    def _level_synchronous_search(self, starting_node, goal, map_function, workers,
+                                  chunk_size, detach):
+        """
+        :param map_function: function like map, used to run _expand_nodes over the
+                chunks of a level
+        :param workers: integer, number of workers map_function spreads chunks across
+        :param chunk_size: integer or None, see parallel_breadth_first
+        :param detach: boolean, whether nodes cross a process boundary and have to be
+                detached and attached again
+        """
+        stats = self._start_stats()
+        started_at = time.monotonic()
+        nodes_expanded = 0
+        visited = VisitedTable(self._max_visited)
+        visited.add(starting_node.state_key())
+        if self._goal_test(starting_node, goal, stats):
+            return self._return_result(starting_node, True)
+
+        level = [starting_node]
+        depth = 0
+        try:
+            while level:
+                if self._max_depth is not None and depth >= self._max_depth:
+                    return self._return_budget_exhausted(level[0], BudgetExhausted.MAX_DEPTH)
+
+                size = chunk_size or max(1, -(-len(level) // (workers * 4)))
+                chunks = [level[i:i + size] for i in range(0, len(level), size)]
+                if detach:
+                    sent_chunks = [[node.detached() for node in chunk] for chunk in chunks]
+                else:
+                    sent_chunks = chunks
+                expanded_chunks = iter(map_function(_expand_nodes, sent_chunks,
+                                                    itertools.repeat(detach)))
+
+                next_level = []
+                for chunk in chunks:
+                    if stats is None:
+                        expanded_chunk = next(expanded_chunks)
+                    else:
+                        expand_started_at = time.perf_counter()
+                        expanded_chunk = next(expanded_chunks)
+                        stats.expand_time += time.perf_counter() - expand_started_at
+                    for parent_node, child_nodes in zip(chunk, expanded_chunk):
+                        # children of the rest of the chunk were already generated,
+                        # but are not counted or searched past the budget
+                        limit = self._exceeded_limit(nodes_expanded, started_at)
+                        if limit is not None:
+                            return self._return_budget_exhausted(parent_node, limit)
+                        nodes_expanded += 1
+                        if stats is not None:
+                            self._count_expansion(parent_node, child_nodes, depth, stats)
+                        for child_node in child_nodes:
+                            if not visited.add(child_node.state_key()):
+                                if stats is not None:
+                                    self._prune(child_node, stats)
+                                continue
+                            if detach:
+                                child_node.attach(parent_node)
+                            if stats is None:
+                                is_goal = child_node.fulfills_goal(goal)
+                            else:
+                                is_goal = self._goal_test(child_node, goal, stats)
+                            if is_goal:
+                                return self._return_result(child_node, True)
+                            next_level.append(child_node)
+
+                level = next_level
+                depth += 1
+                if stats is not None and len(level) > stats.max_frontier:
+                    stats.max_frontier = len(level)
+            return self._return_result(starting_node, False)
+        finally:
+            if stats is not None:
+                stats.states_visited = len(visited)
+                stats.evictions = visited.evictions
+
+    def bidirectional(self, starting_node, goal_node):
+        """
+        Does a breadth-first search forwards from the starting node and backwards from
+        the goal at the same time, always growing whichever side has the smaller
+        frontier, until the two meet. Finds the same shortest paths as breadth_first,
+        usually exploring fewer nodes on problems with a single, fully known goal.
+        max_depth limits the combined length of the two halves.
+
+        :param starting_node: node object for the beginning state of the search
+        :param goal_node: node object for the desired end state. Must implement
+                generate_parent_nodes.
+        :return: dependent on the implementation of _return_result
+        """
+        return self._run_steps(self._bidirectional_steps(starting_node, goal_node))
+
+    def _bidirectional_steps(self, starting_node, goal_node, yield_every=None):
+        stats = self._start_stats()
+        # [nodes expanded on both sides, time the search started]
+        progress = [0, time.monotonic()]
+
+        # state key -> (node, number of steps from its end of the search)
+        forward = {starting_node.state_key(): (starting_node, 0)}
+        backward = {goal_node.state_key(): (goal_node, 0)}
+        # state key -> key of the next state on the way to the goal
+        toward_goal = {goal_node.state_key(): None}
+
+        forward_level = [starting_node]
+        backward_level = [goal_node]
+        # combined depth of the two frontiers
+        depth = 0
+        meeting = None
+        if starting_node.state_key() in backward:
+            meeting = (starting_node, starting_node.state_key())
+
+        try:
+            while meeting is None and forward_level and backward_level:
+                if self._max_depth is not None and depth >= self._max_depth:
+                    return self._return_budget_exhausted(forward_level[0],
+                                                         BudgetExhausted.MAX_DEPTH)
+
+                depth += 1
+                if len(forward_level) <= len(backward_level):
+                    forward_level, meeting, exhausted = yield from \
+                        self._expand_bidirectional_level(forward_level, forward, backward,
+                                                         None, stats, progress, yield_every)
+                else:
+                    backward_level, meeting, exhausted = yield from \
+                        self._expand_bidirectional_level(backward_level, backward, forward,
+                                                         toward_goal, stats, progress,
+                                                         yield_every)
+                    if meeting is not None:
+                        meeting_key = meeting[0].state_key()
+                        meeting = (forward[meeting_key][0], meeting_key)
+                if exhausted is not None:
+                    return self._return_budget_exhausted(*exhausted)
+                if stats is not None and (len(forward_level) + len(backward_level) >
+                                          stats.max_frontier):
+                    stats.max_frontier = len(forward_level) + len(backward_level)
+
+            if meeting is None:
+                return self._return_result(starting_node, False)
+            return self._return_result(self._join_paths(meeting, toward_goal), True)
+        finally:
+            if stats is not None:
+                stats.states_visited = len(forward) + len(backward)
+
+    def _expand_bidirectional_level(self, level, seen, other_seen, toward_goal, stats,
+                                    progress, yield_every):
+        """
+        Expands one whole level of one side of a bidirectional search; a step
+        generator, see _run_steps
+
+        :param toward_goal: dictionary of parent keys to fill in when expanding the
+                backward side; None for the forward side
+        :param stats: SearchStats, or None when not collecting stats
+        :param progress: list of [nodes expanded so far, time the search started]
+        :return: (list of nodes in the next level, None or (node, state key) for the
+                node on this side where the shortest path found meets the other side,
+                None or (node, BudgetExhausted reason) if a budget ran out before node
+                was expanded)
+        """
+        next_level = []
+        meeting = None
+        best_length = None
+        for node in level:
+            limit = self._exceeded_limit(progress[0], progress[1])
+            if limit is not None:
+                return next_level, None, (node, limit)
+            progress[0] += 1
+            node_key = node.state_key()
+            depth = seen[node_key][1] + 1
+            if yield_every is not None and progress[0] % yield_every == 0:
+                yield SearchProgress(node, depth - 1, len(level) + len(next_level),
+                                     progress[0])
+            if stats is not None:
+                new_nodes = self._expand(node, depth - 1, stats,
+                                         backward=toward_goal is not None)
+            elif toward_goal is None:
+                new_nodes = node.generate_child_nodes()
+            else:
+                new_nodes = node.generate_parent_nodes()
+
+            for new_node in new_nodes:
+                key = new_node.state_key()
+                if key in seen:
+                    if stats is not None:
+                        self._prune(new_node, stats)
+                    continue
+                seen[key] = (new_node, depth)
+                if toward_goal is not None:
+                    toward_goal[key] = node_key
+                next_level.append(new_node)
+
+                if key in other_seen:
+                    length = depth + other_seen[key][1]
+                    if best_length is None or length < best_length:
+                        best_length = length
+                        meeting = (new_node, key)
+        return next_level, meeting, None
+
+    @staticmethod
+    def _join_paths(meeting, toward_goal):
+        """
+        Extends the forward node where the two searches met along the backward path,
+        regenerating each step as a child so the final node's history runs all the way
+        from the starting node.
+
+        :param meeting: (forward node, its state key)
+        :param toward_goal: dictionary of parent keys filled in by the backward side
+        :return: node that fulfills the goal
+        """
+        node, key = meeting
+        next_key = toward_goal[key]
+        while next_key is not None:
+            node = next(child for child in node.generate_child_nodes()
+                        if child.state_key() == next_key)
+            next_key = toward_goal[next_key]
+        return node
+
+    def iter_solutions(self, starting_node, goal, shortest_first=True):
+        """
+        Generates every node that fulfills the goal, one at a time as they are found.
+        There is no visited table, since a repeated state may lie on another solution;
+        instead a node is only dropped when its state is already on its own path. Nodes
+        that fulfill the goal are not explored any further.
+
+        The budgets end the stream early. Without max_depth, the number of paths
+        explored can grow exponentially with their length.
+
         :param starting_node: node object for the beginning state of the search
         :param goal: object representing the desired end state
-        :param queue_expansion_function: function to determine how to add more nodes to
-                the queue
+        :param shortest_first: boolean, whether to explore breadth-first, so solutions
+                come out in order of length; with False the search is depth-first and
+                only holds the pending siblings of the current path
+        :return: generator of nodes
+        """
+        stats = self._start_stats()
+        started_at = time.monotonic()
+        nodes_expanded = 0
+        max_depth = self._max_depth
+
+        # the frontier holds (node, depth, path keys) entries, where path keys is the
+        # (state key, parent's path keys) chain back to the starting node
+        frontier = QueueFrontier() if shortest_first else StackFrontier()
+        frontier.push((starting_node, 0, (starting_node.state_key(), None)))
+        while frontier:
+            current_node, depth, path_keys = frontier.pop()
+            if self._goal_test(current_node, goal, stats):
+                yield current_node
+                continue
+            if max_depth is not None and depth >= max_depth:
+                continue
+            if self._exceeded_limit(nodes_expanded, started_at) is not None:
+                return
+            nodes_expanded += 1
+
+            frontier.extend(self._off_path(self._expand(current_node, depth, stats),
+                                           depth + 1, path_keys, stats))
+            if stats is not None and len(frontier) > stats.max_frontier:
+                stats.max_frontier = len(frontier)
+
+    def _off_path(self, nodes, depth, path_keys, stats):
+        """
+        Filters out nodes whose state is already on the path that led to them
+
+        :param path_keys: (state key, parent's path keys) chain for the parent
+        :return: generator of (node, depth, path keys) entries
+        """
+        for node in nodes:
+            key = node.state_key()
+            entry = path_keys
+            while entry is not None and entry[0] != key:
+                entry = entry[1]
+            if entry is None:
+                yield node, depth, (key, path_keys)
+            elif stats is not None:
+                self._prune(node, stats)
+
+    def breadth_first_to_mirror(self, starting_node):
+        """
+        Finds a shortest path from the starting node to its own mirror image, exploring
+        each pair of mirrored states only once.
+
+        If a state X is reachable in a steps and the mirror image of X in b steps, then
+        mirroring the second path and walking it backwards leads from X to the mirror of
+        the starting node, for a path of a + b steps; a state that is its own mirror
+        image at depth a gives a path of 2a. This is a bidirectional search whose
+        backward half is the mirror of the forward half, so the two never need to be
+        stored separately. The level on which the first such meeting happens is
+        finished, and the shortest path found on it is as short as breadth_first's.
+
+        Nodes must implement mirror_key and canonical_key, and moves must be reversible.
+        max_depth limits the combined length of the two halves.
+
+        :param starting_node: node object for the beginning state of the search
+        :return: dependent on the implementation of _return_result
+        """
+        return self._run_steps(self._breadth_first_to_mirror_steps(starting_node))
+
+    def _breadth_first_to_mirror_steps(self, starting_node, yield_every=None):
+        stats = self._start_stats()
+        started_at = time.monotonic()
+        nodes_expanded = 0
+        max_depth = self._max_depth
+        if starting_node.mirror_key() == starting_node.state_key():
+            return self._return_result(starting_node, True)
+
+        # canonical key -> (node, depth, canonical key of the node's parent)
+        seen = {starting_node.canonical_key(): (starting_node, 0, None)}
+        level = [starting_node]
+        depth = 0
+        try:
+            while level:
+                # paths joined while expanding this level are at least 2 * depth + 1
+                # moves long
+                if max_depth is not None and 2 * depth >= max_depth:
+                    return self._return_budget_exhausted(level[0], BudgetExhausted.MAX_DEPTH)
+
+                # (path length, node, node whose mirrored path leads on to the goal)
+                best_meeting = None
+                next_level = []
+                for node in level:
+                    limit = self._exceeded_limit(nodes_expanded, started_at)
+                    if limit is not None:
+                        return self._return_budget_exhausted(node, limit)
+                    nodes_expanded += 1
+                    if yield_every is not None and nodes_expanded % yield_every == 0:
+                        yield SearchProgress(node, depth, len(level) + len(next_level),
+                                             nodes_expanded)
+                    node_key = node.canonical_key()
+                    for child_node in self._expand(node, depth, stats):
+                        key = child_node.canonical_key()
+                        if key in seen:
+                            other_node, other_depth, _ = seen[key]
+                            length = depth + 1 + other_depth
+                            if (other_node.state_key() != child_node.state_key() and
+                                    (max_depth is None or length <= max_depth) and
+                                    (best_meeting is None or length < best_meeting[0])):
+                                best_meeting = (length, child_node, other_node)
+                            if stats is not None:
+                                self._prune(child_node, stats)
+                            continue
+
+                        seen[key] = (child_node, depth + 1, node_key)
+                        length = 2 * (depth + 1)
+                        if (child_node.mirror_key() == child_node.state_key() and
+                                (max_depth is None or length <= max_depth) and
+                                (best_meeting is None or length < best_meeting[0])):
+                            best_meeting = (length, child_node, child_node)
+                        next_level.append(child_node)
+
+                if best_meeting is not None:
+                    return self._return_result(
+                        self._join_mirrored_path(best_meeting[1], best_meeting[2], seen),
+                        True)
+                level = next_level
+                depth += 1
+                if stats is not None and len(level) > stats.max_frontier:
+                    stats.max_frontier = len(level)
+            return self._return_result(starting_node, False)
+        finally:
+            if stats is not None:
+                stats.states_visited = len(seen)
+
+    @staticmethod
+    def _join_mirrored_path(node, other_node, seen):
+        """
+        Extends node along the mirror image of the path that led to other_node, walked
+        backwards, regenerating each step as a child.
+
+        :param node: node reached from the starting node
+        :param other_node: stored node that is node's mirror image, or node itself
+        :param seen: dictionary of canonical keys filled in by breadth_first_to_mirror
+        :return: node for the mirror image of the starting node
+        """
+        parent_key = seen[other_node.canonical_key()][2]
+        while parent_key is not None:
+            ancestor, _, parent_key = seen[parent_key]
+            next_key = ancestor.mirror_key()
+            node = next(child for child in node.generate_child_nodes()
+                        if child.state_key() == next_key)
+        return node
+
+    def breadth_first_to_goals(self, starting_node, goals):
+        """
+        Does one breadth-first search for several goals at once, carrying on until every
+        goal has been found or the space runs out. Goals are matched by looking up each
+        node's state_key() among their goal_key()s, so the number of goals does not
+        slow down the search.
+
+        :param starting_node: node object for the beginning state of the search
+        :param goals: iterable of objects representing desired end states
+        :return: dictionary of each goal to the result for it, which is dependent on
+                the implementation of _return_result (or _return_budget_exhausted, for
+                goals not found before a budget ran out)
+        """
+        return self._run_steps(self._breadth_first_to_goals_steps(starting_node, goals))
+
+    def _breadth_first_to_goals_steps(self, starting_node, goals, yield_every=None):
+        stats = self._start_stats()
+        started_at = time.monotonic()
+        nodes_expanded = 0
+        max_depth = self._max_depth
+        depth_cut_off = False
+        limit = None
+        # goal key -> goals not found yet
+        remaining = {}
+        for goal in goals:
+            remaining.setdefault(starting_node.goal_key(goal), []).append(goal)
+        results = {}
+        visited = VisitedTable(self._max_visited)
+        visited.add(starting_node.state_key())
+
+        frontier = QueueFrontier()
+        frontier.push((starting_node, 0))
+        current_node = starting_node
+        try:
+            while frontier and remaining:
+                current_node, depth = frontier.pop()
+                found_goals = remaining.pop(current_node.state_key(), None)
+                if found_goals is not None:
+                    for goal in found_goals:
+                        results[goal] = self._return_result(current_node, True)
+                    if not remaining:
+                        break
+                if max_depth is not None and depth >= max_depth:
+                    depth_cut_off = True
+                    continue
+                limit = self._exceeded_limit(nodes_expanded, started_at)
+                if limit is not None:
+                    break
+                nodes_expanded += 1
+                if yield_every is not None and nodes_expanded % yield_every == 0:
+                    yield SearchProgress(current_node, depth, len(frontier), nodes_expanded)
+
+                if stats is None:
+                    frontier.extend(self._unvisited(current_node.generate_child_nodes(),
+                                                    depth + 1, visited))
+                else:
+                    frontier.extend(self._counted_unvisited(
+                        self._expand(current_node, depth, stats), depth + 1, visited, stats))
+                    if len(frontier) > stats.max_frontier:
+                        stats.max_frontier = len(frontier)
+
+            if limit is None and depth_cut_off:
+                limit = BudgetExhausted.MAX_DEPTH
+            for found_goals in remaining.values():
+                for goal in found_goals:
+                    if limit is None:
+                        results[goal] = self._return_result(starting_node, False)
+                    else:
+                        results[goal] = self._return_budget_exhausted(current_node, limit)
+            return results
+        finally:
+            if stats is not None:
+                stats.states_visited = len(visited)
+                stats.evictions = visited.evictions
+
+    def greedy_best_first(self, starting_node, goal):
+        """
+        Does a best-first search, always exploring the pending node that the node's
+        heuristic rates as closest to the goal. Usually fast, but the path found is not
+        necessarily the shortest.
+
+        :param starting_node: node object for the beginning state of the search
+        :param goal: object representing the desired end state
+        :return: dependent on the implementation of _return_result
+        """
+        return self._search(starting_node, goal,
+                            PriorityFrontier(lambda entry: entry[0].heuristic(goal)))
+
+    def a_star(self, starting_node, goal):
+        """
+        Does an A* search, exploring pending nodes in order of path_cost() plus
+        heuristic(goal). With a heuristic that never overestimates, the first node
+        found that fulfills the goal is reached by a cheapest path.
+
+        :param starting_node: node object for the beginning state of the search
+        :param goal: object representing the desired end state
+        :return: dependent on the implementation of _return_result
+        """
+        return self._run_steps(self._a_star_steps(starting_node, goal))
+
+    def _a_star_steps(self, starting_node, goal, yield_every=None):
+        def priority(entry):
+            estimate = entry[0].heuristic(goal)
+            return entry[0].path_cost() + estimate, estimate
+
+        stats = self._start_stats()
+        started_at = time.monotonic()
+        nodes_expanded = 0
+        max_depth = self._max_depth
+        depth_cut_off = False
+
+        # A state can be reached by a cheaper path after it was first generated, so
+        # instead of a visited table A* keeps the cheapest known cost for each state
+        # and skips any queued node that has since been beaten.
+        best_costs = {starting_node.state_key(): starting_node.path_cost()}
+        frontier = PriorityFrontier(priority)
+        frontier.push((starting_node, 0))
+        current_node = starting_node
+        try:
+            while frontier:
+                current_node, depth = frontier.pop()
+                if current_node.path_cost() > best_costs[current_node.state_key()]:
+                    continue
+                if stats is None:
+                    is_goal = current_node.fulfills_goal(goal)
+                else:
+                    is_goal = self._goal_test(current_node, goal, stats)
+                if is_goal:
+                    return self._return_result(current_node, True)
+                if max_depth is not None and depth >= max_depth:
+                    depth_cut_off = True
+                    continue
+                limit = self._exceeded_limit(nodes_expanded, started_at)
+                if limit is not None:
+                    return self._return_budget_exhausted(current_node, limit)
+                nodes_expanded += 1
+                if yield_every is not None and nodes_expanded % yield_every == 0:
+                    yield SearchProgress(current_node, depth, len(frontier), nodes_expanded)
+
+                if stats is None:
+                    child_nodes = current_node.generate_child_nodes()
+                else:
+                    child_nodes = self._expand(current_node, depth, stats)
+                for child_node in child_nodes:
+                    key = child_node.state_key()
+                    cost = child_node.path_cost()
+                    if key in best_costs and best_costs[key] <= cost:
+                        if stats is not None:
+                            self._prune(child_node, stats)
+                        continue
+                    best_costs[key] = cost
+                    frontier.push((child_node, depth + 1))
+                if stats is not None and len(frontier) > stats.max_frontier:
+                    stats.max_frontier = len(frontier)
+
+            if depth_cut_off:
+                return self._return_budget_exhausted(current_node, BudgetExhausted.MAX_DEPTH)
+            return self._return_result(current_node, False)
+        finally:
+            if stats is not None:
+                stats.states_visited = len(best_costs)
+
+    def _search(self, starting_node, goal, frontier):
+        """
+        :param starting_node: node object for the beginning state of the search
+        :param goal: object representing the desired end state
+        :param frontier: empty AbstractFrontier that determines the order in which
+                pending nodes are explored
         :return: the result of calling _return_result, which is dependent on the class
                 that implements it.
         """
+        return self._run_steps(self._search_steps(starting_node, goal, frontier))
+
+    def _search_steps(self, starting_node, goal, frontier, yield_every=None):
 
         # While the algorithm specifications are written recursively, Python does
         # not handle tail recursion very well. To prevent running out the stack, the
         # algorithm is written iteratively.
-        pending_nodes = []
+        stats = self._start_stats()
+        started_at = time.monotonic()
+        nodes_expanded = 0
+        max_depth = self._max_depth
+        depth_cut_off = False
+        # a depth-first search can reach a state deep in the tree before finding a
+        # shorter path to it, which has to be explored again to stay within max_depth
+        visited = VisitedTable(self._max_visited, track_depth=max_depth is not None)
+        visited.add(starting_node.state_key())
+
+        # the frontier holds (node, depth) pairs
+        frontier.push((starting_node, 0))
         current_node = starting_node
-        while not current_node.fulfills_goal(goal):
-            new_current, new_pending = queue_expansion_function(current_node, pending_nodes)
-            if not new_pending:
-                return self._return_result(current_node, False)
-        return self._return_result(current_node, True)
+        try:
+            while frontier:
+                current_node, depth = frontier.pop()
+                if stats is None:
+                    is_goal = current_node.fulfills_goal(goal)
+                else:
+                    is_goal = self._goal_test(current_node, goal, stats)
+                if is_goal:
+                    return self._return_result(current_node, True)
+                if max_depth is not None and depth >= max_depth:
+                    depth_cut_off = True
+                    continue
+                limit = self._exceeded_limit(nodes_expanded, started_at)
+                if limit is not None:
+                    return self._return_budget_exhausted(current_node, limit)
+                nodes_expanded += 1
+                if yield_every is not None and nodes_expanded % yield_every == 0:
+                    yield SearchProgress(current_node, depth, len(frontier), nodes_expanded)
+
+                if stats is None:
+                    frontier.extend(self._unvisited(current_node.generate_child_nodes(),
+                                                    depth + 1, visited))
+                else:
+                    frontier.extend(self._counted_unvisited(
+                        self._expand(current_node, depth, stats), depth + 1, visited, stats))
+                    if len(frontier) > stats.max_frontier:
+                        stats.max_frontier = len(frontier)
+
+            if depth_cut_off:
+                return self._return_budget_exhausted(current_node, BudgetExhausted.MAX_DEPTH)
+            return self._return_result(current_node, False)
+        finally:
+            if stats is not None:
+                stats.states_visited = len(visited)
+                stats.evictions = visited.evictions
+
+    @staticmethod
+    def _unvisited(nodes, depth, visited):
+        """
+        Filters out nodes whose state has already been reached, marking the rest
+        as visited. Tables that track depths only filter out states already reached
+        at depth or shallower.
+
+        :return: generator of (node, depth) pairs
+        """
+        for node in nodes:
+            if visited.add(node.state_key(), depth):
+                yield node, depth
+
+    def _counted_unvisited(self, nodes, depth, visited, stats):
+        """
+        Same as _unvisited, also counting and reporting the pruned nodes
+        """
+        for node in nodes:
+            if visited.add(node.state_key(), depth):
+                yield node, depth
+            else:
+                self._prune(node, stats)
+
+    def _start_stats(self):
+        """
+        :return: a new SearchStats, also stored as last_stats, or None when the search
+                is not collecting stats
+        """
+        self.last_stats = SearchStats() if self._collect_stats else None
+        return self.last_stats
+
+    def _goal_test(self, node, goal, stats):
+        """
+        Calls node.fulfills_goal, timing it and calling the goal test hook when
+        collecting stats
+
+        :param stats: SearchStats, or None when not collecting stats
+        :return: boolean
+        """
+        if stats is None:
+            return node.fulfills_goal(goal)
+
+        started_at = time.perf_counter()
+        is_goal = node.fulfills_goal(goal)
+        stats.goal_test_time += time.perf_counter() - started_at
+        if self._hooks is not None:
+            self._hooks.on_goal_test(node, is_goal)
+        return is_goal
+
+    def _expand(self, node, depth, stats, backward=False):
+        """
+        Generates the children of node, timing and counting them when collecting stats.
+        Counting them means generating them all up front, even for depth-first search.
+
+        :param depth: integer, number of steps from the starting node to node
+        :param stats: SearchStats, or None when not collecting stats
+        :param backward: boolean, whether to generate parent nodes instead
+        :return: iterable of nodes
+        """
+        if stats is None:
+            return node.generate_parent_nodes() if backward else node.generate_child_nodes()
+
+        started_at = time.perf_counter()
+        if backward:
+            child_nodes = list(node.generate_parent_nodes())
+        else:
+            child_nodes = list(node.generate_child_nodes())
+        stats.expand_time += time.perf_counter() - started_at
+        self._count_expansion(node, child_nodes, depth, stats)
+        return child_nodes
+
+    def _count_expansion(self, node, child_nodes, depth, stats):
+        """
+        Records one expansion in stats and calls the expand hook
+
+        :param child_nodes: list of the nodes generated from node
+        """
+        stats.nodes_expanded += 1
+        stats.nodes_generated += len(child_nodes)
+        if child_nodes and depth + 1 > stats.max_depth:
+            stats.max_depth = depth + 1
+        candidates = node.candidate_child_count()
+        if candidates is not None:
+            stats.invalid_discarded += candidates - len(child_nodes)
+        if self._hooks is not None:
+            self._hooks.on_expand(node, child_nodes, depth)
+
+    def _prune(self, node, stats):
+        """
+        Records a node dropped as a repeated state, and calls the prune hook
+        """
+        stats.duplicates_pruned += 1
+        if self._hooks is not None:
+            self._hooks.on_prune(node)
+
+    def _exceeded_limit(self, nodes_expanded, started_at):
+        """
+        Checks the node and time budgets before another node is expanded
+
+        :param nodes_expanded: integer, number of nodes expanded so far
+        :param started_at: time.monotonic() when the search started
+        :return: BudgetExhausted reason, or None if the search can carry on
+        """
+        cancelled = getattr(_executor_call, 'cancelled', None)
+        if cancelled is not None and cancelled.is_set():
+            return BudgetExhausted.CANCELLED
+        if self._max_nodes is not None and nodes_expanded >= self._max_nodes:
+            return BudgetExhausted.MAX_NODES
+        if (self._time_limit is not None and
+                time.monotonic() - started_at >= self._time_limit):
+            return BudgetExhausted.TIME_LIMIT
+        return None
+
+    async def search_async(self, mode, *args, yield_every=1000, deadline=None,
+                           on_progress=None):
+        """
+        Runs a search mode inside the running asyncio event loop, handing control back
+        to the loop every yield_every expansions. Cancelling the task stops the search
+        at its next pause.
+
+        :param mode: string, one of depth_first, breadth_first, iterative_deepening,
+                greedy_best_first, a_star, bidirectional, breadth_first_to_mirror or
+                breadth_first_to_goals
+        :param args: arguments for the search mode
+        :param yield_every: integer, number of expansions between pauses
+        :param deadline: event loop time (see loop.time()) after which the search gives
+                up, checked at every pause; None for no deadline
+        :param on_progress: function called with a SearchProgress at every pause; None
+                for no progress reports
+        :return: dependent on the implementation of _return_result
+        """
+        loop = asyncio.get_running_loop()
+        steps = self._steps(mode, args, yield_every)
+        try:
+            while True:
+                try:
+                    progress = next(steps)
+                except StopIteration as stop:
+                    return stop.value
+                if on_progress is not None:
+                    on_progress(progress)
+                if deadline is not None and loop.time() >= deadline:
+                    return self._return_budget_exhausted(progress.node,
+                                                         BudgetExhausted.TIME_LIMIT)
+                await asyncio.sleep(0)
+        finally:
+            steps.close()
+
+    async def run_in_executor(self, mode, *args, executor=None):
+        """
+        Runs any search mode on an executor, so the event loop can serve other work
+        while a search runs on another thread or process.
+
+        With a thread executor, cancelling the task also stops the search, at its next
+        expansion. A process executor works on a copy of this object, so cancelling
+        only stops waiting for it, and last_stats is not updated.
+
+        :param mode: string, name of the search method
+        :param args: arguments for the search method
+        :param executor: concurrent.futures executor; None for the loop's default
+                thread pool
+        :return: dependent on the implementation of _return_result
+        """
+        loop = asyncio.get_running_loop()
+        search = functools.partial(getattr(self, mode), *args)
+        # each call gets its own event, so cancelling one call never affects another
+        # call, or later searches with this object
+        cancelled = threading.Event()
+        if not isinstance(executor, ProcessPoolExecutor):
+            search = functools.partial(_run_cancellable, cancelled, search)
+        try:
+            return await loop.run_in_executor(executor, search)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    def _steps(self, mode, args, yield_every):
+        """
+        :return: step generator running the given search mode
+        """
+        if mode == 'depth_first':
+            return self._search_steps(args[0], args[1], StackFrontier(), yield_every)
+        elif mode == 'breadth_first':
+            return self._search_steps(args[0], args[1], QueueFrontier(), yield_every)
+        elif mode == 'greedy_best_first':
+            goal = args[1]
+            return self._search_steps(
+                args[0], goal, PriorityFrontier(lambda entry: entry[0].heuristic(goal)),
+                yield_every)
+        elif mode == 'iterative_deepening':
+            return self._iterative_deepening_steps(args[0], args[1], yield_every)
+        elif mode == 'a_star':
+            return self._a_star_steps(args[0], args[1], yield_every)
+        elif mode == 'bidirectional':
+            return self._bidirectional_steps(args[0], args[1], yield_every)
+        elif mode == 'breadth_first_to_mirror':
+            return self._breadth_first_to_mirror_steps(args[0], yield_every)
+        elif mode == 'breadth_first_to_goals':
+            return self._breadth_first_to_goals_steps(args[0], args[1], yield_every)
+        raise ValueError('{0!r} can not be run with search_async'.format(mode))
+
+    @staticmethod
+    def _run_steps(steps):
+        """
+        Runs a step generator to the end. Step generators hold the body of a search
+        mode; they yield a SearchProgress every yield_every expansions, never when
+        yield_every is None, and return the search's result.
+
+        :param steps: generator
+        :return: the value the generator returned
+        """
+        try:
+            while True:
+                next(steps)
+        except StopIteration as stop:
+            return stop.value
 
     @abstractmethod
     def _return_result(self, final_node, is_success):
         pass
 
+    def _return_budget_exhausted(self, final_node, reason):
+        """
+        :param final_node: last node the search looked at
+        :param reason: BudgetExhausted reason the search stopped for
+        :return: BudgetExhausted, unless overridden
+        """
+        return BudgetExhausted(reason, final_node)
+
+
+# The cancellation event of the run_in_executor call running on the current thread
+_executor_call = threading.local()
+
+
+def _run_cancellable(cancelled, search):
+    """
+    Runs a search on an executor thread, where _exceeded_limit checks cancelled
+
+    :param cancelled: threading.Event set when the run_in_executor call is cancelled
+    :param search: function running the search
+    :return: result of search
+    """
+    _executor_call.cancelled = cancelled
+    try:
+        return search()
+    finally:
+        _executor_call.cancelled = None
+
+
+def _expand_nodes(nodes, detach):
+    """
+    Generates the children of a chunk of nodes. Runs in the worker processes of
+    parallel_breadth_first, so it has to be a module-level function.
+
+    :param nodes: list of nodes
+    :param detach: boolean, whether to detach the children before returning them
+    :return: list holding a list of children for each node
+    """
+    if not nodes:
+        return []
+    expanded = type(nodes[0]).generate_child_nodes_for_level(nodes)
+    if detach:
+        return [[child_node.detached() for child_node in child_nodes]
+                for child_nodes in expanded]
+    return expanded
+
 
 class DoesItHaveASolution(AbstractSearch):
     """
@@ -130,7 +1595,8 @@ class DoesItHaveASolution(AbstractSearch):
         }
 
     Per the algorithm described, this search only returns True or False to the question
-    "Is there a solution to the problem in the given problem space?"
+    "Is there a solution to the problem in the given problem space?" A search that runs
+    out of budget returns a BudgetExhausted instead, which is also falsy.
     """
 
     def _return_result(self, final_node, is_success):
@@ -0,0 +1,172 @@
+"""
+Persistent cache of block game solutions, kept in a SQLite database.
+
+Results are keyed on everything that decides the answer: the block and hand counts,
+the starting state, the goal and the algorithm. The database runs in write-ahead
+logging mode, so any number of processes can read it while one of them writes.
+"""
+import json
+import os
+import sqlite3
+import time
+
+
+class SolutionCache(object):
+    """
+    Stores the outcome, path and search stats of solved block games, evicting the
+    least recently used results once it holds more than max_entries.
+
+    Each process opens its own connection the first time it uses the cache, so a cache
+    can be handed to worker processes.
+    """
+
+    # seconds to wait for another process to finish writing
+    TIMEOUT = 30.0
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS solutions (
+            num_red_blocks INTEGER NOT NULL,
+            num_blue_blocks INTEGER NOT NULL,
+            num_hands INTEGER NOT NULL,
+            starting_state TEXT NOT NULL,
+            goal TEXT NOT NULL,
+            algorithm TEXT NOT NULL,
+            outcome TEXT NOT NULL,
+            path TEXT,
+            stats TEXT,
+            last_used REAL NOT NULL,
+            PRIMARY KEY (num_red_blocks, num_blue_blocks, num_hands, starting_state, goal,
+                         algorithm)
+        );
+        CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used);
+    '''
+
+    def __init__(self, path, max_entries=None):
+        """
+        :param path: string, file name of the database; created if it does not exist
+        :param max_entries: integer, maximum number of results to keep; None for no limit
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._connection = None
+        self._pid = None
+
+    def __getstate__(self):
+        # connections can't be shared between processes
+        return {'path': self.path, 'max_entries': self.max_entries}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state['max_entries'])
+
+    def _connect(self):
+        """
+        :return: sqlite3 connection for the current process
+        """
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.TIMEOUT,
+                                         isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.executescript(self.SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    @staticmethod
+    def _key(num_red_blocks, num_blue_blocks, num_hands, starting_state, goal, algorithm):
+        return (num_red_blocks, num_blue_blocks, num_hands, json.dumps(starting_state),
+                json.dumps(goal), algorithm)
+
+    def get(self, num_red_blocks, num_blue_blocks, num_hands, starting_state, goal,
+            algorithm):
+        """
+        :param starting_state: tuple representing the node state the search starts from
+        :param goal: tuple representing the desired end state
+        :param algorithm: string, name of the algorithm that solved the game
+        :return: dictionary with outcome, path (list of state tuples, or None) and stats
+                (dictionary, or None); None if the result is not cached
+        """
+        key = self._key(num_red_blocks, num_blue_blocks, num_hands, starting_state, goal,
+                        algorithm)
+        connection = self._connect()
+        row = connection.execute(
+            'SELECT outcome, path, stats FROM solutions WHERE num_red_blocks = ? AND '
+            'num_blue_blocks = ? AND num_hands = ? AND starting_state = ? AND goal = ? AND '
+            'algorithm = ?', key).fetchone()
+        if row is None:
+            return None
+
+        # don't wait for the write lock just to refresh last_used, so readers never
+        # queue up behind a writer
+        connection.execute('PRAGMA busy_timeout = 0')
+        try:
+            connection.execute(
+                'UPDATE solutions SET last_used = ? WHERE num_red_blocks = ? AND '
+                'num_blue_blocks = ? AND num_hands = ? AND starting_state = ? AND '
+                'goal = ? AND algorithm = ?', (time.time(),) + key)
+        except sqlite3.OperationalError:
+            # another process is holding the write lock; a stale last_used only makes
+            # the result a little more likely to be evicted
+            pass
+        finally:
+            connection.execute('PRAGMA busy_timeout = {0:d}'.format(int(self.TIMEOUT * 1000)))
+
+        outcome, path, stats = row
+        return {
+            'outcome': outcome,
+            'path': None if path is None else [self._state(state) for state in json.loads(path)],
+            'stats': None if stats is None else json.loads(stats),
+        }
+
+    def put(self, num_red_blocks, num_blue_blocks, num_hands, starting_state, goal,
+            algorithm, outcome, path=None, stats=None):
+        """
+        Stores a result, replacing any earlier result for the same key
+
+        :param outcome: string, e.g. 'solved' or 'no_solution'
+        :param path: list of state tuples from the starting state to the goal, or None
+        :param stats: dictionary of search stats, or None
+        """
+        key = self._key(num_red_blocks, num_blue_blocks, num_hands, starting_state, goal,
+                        algorithm)
+        connection = self._connect()
+        with _transaction(connection):
+            connection.execute(
+                'INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                key + (outcome, None if path is None else json.dumps(path),
+                       None if stats is None else json.dumps(stats), time.time()))
+            if self.max_entries is not None:
+                connection.execute(
+                    'DELETE FROM solutions WHERE rowid IN (SELECT rowid FROM solutions '
+                    'ORDER BY last_used DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    @staticmethod
+    def _state(state):
+        """
+        Turns a state read back from JSON into nested tuples again
+        """
+        return tuple(tuple(part) if isinstance(part, list) else part for part in state)
+
+
+class _transaction(object):
+    """
+    Runs the statements inside the with block as one write transaction
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __enter__(self):
+        self._connection.execute('BEGIN IMMEDIATE')
+        return self._connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._connection.execute('COMMIT' if exc_type is None else 'ROLLBACK')
+        return False
@@ -0,0 +1,267 @@
+"""
+Writes block game solutions to file-like objects, one state at a time.
+
+Three formats are supported:
+
+    text        the ASCII-art rows of BlockConfigurationNode.__repr__, one per state
+    JSON lines  one object per solution holding the starting state and the moves
+    binary      the same move list packed as little-endian integers
+
+A solution is given as a sequence of state tuples (see moving_blocks), as returned by
+BlockGameSolver. Moves are stored as the number of red and blue blocks carried, since
+the hands always carry them away from the pile they are on.
+"""
+import json
+import struct
+import sys
+from abc import ABCMeta, abstractmethod
+from array import array
+from functools import lru_cache
+
+
+# Number of row templates kept by row_template, one for each (totals, hands) combination
+ROW_TEMPLATE_CACHE_SIZE = 128
+
+PILE1_INDEX = 0
+PILE2_INDEX = 1
+
+
+class RowTemplate(object):
+    """
+    Renders the ASCII-art row for states of one game, slicing each field out of full
+    strings of blocks and spaces prepared up front, so both the template and each row
+    take space proportional to the block totals:
+
+        [RR  | BBB  ] OO   [R   | BB   ]
+    """
+
+    __slots__ = ('_total_red', '_total_blue', '_reds', '_blues', '_spaces', '_hands')
+
+    def __init__(self, total_red, total_blue, num_hands):
+        """
+        :param total_red: integer, total number of red blocks in the game
+        :param total_blue: integer, total number of blue blocks in the game
+        :param num_hands: integer, number of hands available to move blocks
+        """
+        self._total_red = total_red
+        self._total_blue = total_blue
+        self._reds = 'R' * total_red
+        self._blues = 'B' * total_blue
+        self._spaces = ' ' * max(total_red, total_blue)
+        hands, space = 'O' * num_hands, ' ' * num_hands
+        self._hands = (' ' + hands + space + ' ', ' ' + space + hands + ' ')
+
+    def render(self, state_tuple):
+        """
+        :param state_tuple: tuple representing a valid node state
+        :return: string
+        """
+        red_state, blue_state, hand_location = state_tuple
+        reds, blues, spaces = self._reds, self._blues, self._spaces
+        total_red, total_blue = self._total_red, self._total_blue
+        pile1_red, pile2_red = red_state
+        pile1_blue, pile2_blue = blue_state
+        return ''.join((
+            '[', reds[:pile1_red], spaces[:total_red - pile1_red], ' | ',
+            blues[:pile1_blue], spaces[:total_blue - pile1_blue], ']',
+            self._hands[hand_location],
+            '[', reds[:pile2_red], spaces[:total_red - pile2_red], ' | ',
+            blues[:pile2_blue], spaces[:total_blue - pile2_blue], ']'))
+
+
+@lru_cache(maxsize=ROW_TEMPLATE_CACHE_SIZE)
+def row_template(total_red, total_blue, num_hands):
+    """
+    :return: RowTemplate for the game, shared between every state rendered for it
+    """
+    return RowTemplate(total_red, total_blue, num_hands)
+
+
+def row_template_for_state(state_tuple, num_hands):
+    """
+    :param state_tuple: tuple representing a valid node state of the game
+    :return: RowTemplate for the game the state belongs to
+    """
+    red_state, blue_state, _ = state_tuple
+    return row_template(sum(red_state), sum(blue_state), num_hands)
+
+
+class AbstractTraceWriter(object):
+    """
+    Base class for the trace writers. Each solution passed to write goes straight to
+    the file, without the whole trace being built in memory first.
+
+    Should implement the following methods:
+        write
+    """
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self, trace_file):
+        """
+        :param trace_file: file-like object opened for writing, in text mode for the
+                text and JSON lines formats and binary mode for the binary format
+        """
+        self._file = trace_file
+
+    @abstractmethod
+    def write(self, states, num_hands):
+        """
+        :param states: sequence of state tuples from the starting state to the goal
+        :param num_hands: integer, number of hands available to move blocks
+        """
+        pass
+
+    def write_all(self, solutions, num_hands):
+        """
+        :param solutions: iterable of sequences of state tuples, e.g. a generator
+        :param num_hands: integer, number of hands available to move blocks
+        """
+        for states in solutions:
+            self.write(states, num_hands)
+
+
+class TextTraceWriter(AbstractTraceWriter):
+    """
+    One ASCII-art row per state, with a blank line between solutions
+    """
+
+    def __init__(self, trace_file):
+        super(TextTraceWriter, self).__init__(trace_file)
+        self._solutions_written = 0
+
+    def write(self, states, num_hands):
+        if self._solutions_written:
+            self._file.write('\n')
+        template = None
+        for state_tuple in states:
+            if template is None:
+                template = row_template_for_state(state_tuple, num_hands)
+            self._file.write(template.render(state_tuple))
+            self._file.write('\n')
+        self._solutions_written += 1
+
+
+class JsonLinesTraceWriter(AbstractTraceWriter):
+    """
+    One JSON object per line and solution:
+
+        {"total_red": 3, "total_blue": 5, "num_hands": 2, "start": [[3, 0], [5, 0], 0],
+         "moves": [[1, 1], [0, 1], ...]}
+    """
+
+    def write(self, states, num_hands):
+        states = iter(states)
+        start = _first_state(states)
+        self._file.write(json.dumps({
+            'total_red': sum(start[0]),
+            'total_blue': sum(start[1]),
+            'num_hands': num_hands,
+            'start': start,
+            'moves': [list(move) for move in moves_between(start, states)],
+        }, separators=(',', ':')))
+        self._file.write('\n')
+
+
+class BinaryTraceWriter(AbstractTraceWriter):
+    """
+    For each solution, a RECORD header of the block totals, hands, starting pile 1
+    counts, starting hand position and number of moves, followed by the moves as
+    unsigned 16 bit (reds carried, blues carried) pairs. Every number is little-endian.
+    """
+
+    RECORD = struct.Struct('<IIHIIBI')
+
+    def write(self, states, num_hands):
+        states = iter(states)
+        start = _first_state(states)
+        moves = array('H')
+        for move in moves_between(start, states):
+            moves.extend(move)
+        if sys.byteorder != 'little':
+            moves.byteswap()
+        self._file.write(self.RECORD.pack(
+            sum(start[0]), sum(start[1]), num_hands, start[0][PILE1_INDEX],
+            start[1][PILE1_INDEX], start[2], len(moves) // 2))
+        self._file.write(moves.tobytes())
+
+
+def _first_state(states):
+    """
+    :param states: iterator of state tuples
+    :return: the first state
+    """
+    try:
+        return next(states)
+    except StopIteration:
+        raise ValueError('a solution has at least one state')
+
+
+def moves_between(start, states):
+    """
+    :param start: tuple representing the first state of a solution
+    :param states: iterable of the states after it
+    :return: generator of (reds carried, blues carried) for each move
+    """
+    previous = start
+    for state_tuple in states:
+        yield (abs(state_tuple[0][PILE1_INDEX] - previous[0][PILE1_INDEX]),
+               abs(state_tuple[1][PILE1_INDEX] - previous[1][PILE1_INDEX]))
+        previous = state_tuple
+
+
+def states_from_moves(start, moves):
+    """
+    Replays a move list, the reverse of moves_between
+
+    :param start: tuple representing the first state of a solution
+    :param moves: iterable of (reds carried, blues carried)
+    :return: list of state tuples, starting with start
+    """
+    red_state, blue_state, hand_location = start
+    red_state, blue_state = list(red_state), list(blue_state)
+    states = [(tuple(red_state), tuple(blue_state), hand_location)]
+    for reds, blues in moves:
+        other_pile = PILE2_INDEX if hand_location == PILE1_INDEX else PILE1_INDEX
+        red_state[hand_location] -= reds
+        red_state[other_pile] += reds
+        blue_state[hand_location] -= blues
+        blue_state[other_pile] += blues
+        hand_location = other_pile
+        states.append((tuple(red_state), tuple(blue_state), hand_location))
+    return states
+
+
+def read_json_lines_trace(trace_file):
+    """
+    :param trace_file: file-like object written by JsonLinesTraceWriter
+    :return: generator of (list of state tuples, number of hands) for each solution
+    """
+    for line in trace_file:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        (red_pile1, red_pile2), (blue_pile1, blue_pile2), hand_location = record['start']
+        start = ((red_pile1, red_pile2), (blue_pile1, blue_pile2), hand_location)
+        yield states_from_moves(start, record['moves']), record['num_hands']
+
+
+def read_binary_trace(trace_file):
+    """
+    :param trace_file: binary file-like object written by BinaryTraceWriter
+    :return: generator of (list of state tuples, number of hands) for each solution
+    """
+    record_size = BinaryTraceWriter.RECORD.size
+    while True:
+        header = trace_file.read(record_size)
+        if len(header) < record_size:
+            return
+        (total_red, total_blue, num_hands, red_pile1, blue_pile1, hand_location,
+         num_moves) = BinaryTraceWriter.RECORD.unpack(header)
+        moves = array('H')
+        moves.frombytes(trace_file.read(num_moves * 2 * moves.itemsize))
+        if sys.byteorder != 'little':
+            moves.byteswap()
+        start = ((red_pile1, total_red - red_pile1), (blue_pile1, total_blue - blue_pile1),
+                 hand_location)
+        yield states_from_moves(start, zip(moves[::2], moves[1::2])), num_hands
@@ -0,0 +1,56 @@
+import copy
+import os
+import sys
+import unittest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from benchmarks import check_symmetry, compare_to_baseline, run_benchmarks
+
+
+class BenchmarkTests(unittest.TestCase):
+    """Tests for chapter_02.benchmarks"""
+
+    def setUp(self):
+        self.report = run_benchmarks(grid=[(3, 5, 2), (3, 3, 2)],
+                                     modes=['breadth_first', 'a_star'], repeat=1)
+
+    def test_run_benchmarks(self):
+        results = self.report['results']
+        self.assertEqual(4, len(results))
+        self.assertEqual(['solved', 'solved', 'no_solution', 'no_solution'],
+                         [result['outcome'] for result in results])
+        self.assertEqual([13, 13], [result['path_length'] for result in results[:2]])
+        for result in results:
+            self.assertTrue(result['nodes_expanded'] > 0)
+            self.assertTrue(result['max_frontier'] > 0)
+            self.assertTrue(result['peak_memory'] > 0)
+
+    def test_compare_to_baseline__no_regressions(self):
+        self.assertEqual([], compare_to_baseline(self.report, self.report))
+
+    def test_compare_to_baseline__flags_regressions(self):
+        for result in self.report['results']:
+            result['wall_time'] = 1.0
+        # doubled, but by less than MIN_TIME_DIFFERENCE
+        self.report['results'][0]['wall_time'] = 0.004
+        baseline = copy.deepcopy(self.report)
+        baseline['results'][0]['nodes_expanded'] = 1
+        baseline['results'][0]['wall_time'] = 0.002
+        baseline['results'][1]['outcome'] = 'no_solution'
+        baseline['results'][2]['wall_time'] = 0.5
+
+        regressions = compare_to_baseline(self.report, baseline, threshold=0.2)
+        self.assertEqual([(('breadth_first', 3, 5, 2), 'nodes_expanded'),
+                          (('a_star', 3, 5, 2), 'outcome'),
+                          (('breadth_first', 3, 3, 2), 'wall_time')],
+                         [regression[:2] for regression in regressions])
+
+    def test_check_symmetry(self):
+        self.assertEqual([], check_symmetry(grid=[(3, 5, 2), (5, 8, 3)]))
+        self.assertEqual([], check_symmetry(grid=[(3, 3, 2)], compact=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import os
+import pickle
+import sys
+import unittest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from block_engine import BlockEngineNode, BlockEngineSolver, BlockGameSpec, block_game_spec
+from moving_blocks import BlockConfigurationNode
+from search import BudgetExhausted
+
+
+def two_colour_spec(num_red_blocks, num_blue_blocks, num_hands):
+    return block_game_spec((num_red_blocks, num_blue_blocks), num_hands=num_hands,
+                           constraints=((0, 1),))
+
+
+class BlockGameSpecTests(unittest.TestCase):
+
+    def test_pack_and_unpack(self):
+        spec = block_game_spec((2, 3, 5), num_piles=3)
+        state = (((1, 2, 3), (1, 0, 2), (0, 1, 0)), 2)
+        packed = spec.pack(state)
+        self.assertEqual(bytes((1, 2, 3, 1, 0, 2, 0, 1, 0, 2)), packed)
+        self.assertEqual(spec.width, len(packed))
+        self.assertEqual(state, spec.unpack(packed))
+
+    def test_starting_state_and_goal(self):
+        spec = block_game_spec((2, 3, 5), num_piles=3)
+        self.assertEqual((((2, 3, 5), (0, 0, 0), (0, 0, 0)), 0),
+                         spec.unpack(spec.starting_state))
+        self.assertEqual((((0, 0, 0), (0, 0, 0), (2, 3, 5)), 2), spec.unpack(spec.goal))
+        self.assertEqual(spec.goal, spec.mirror(spec.starting_state))
+
+    def test_is_valid(self):
+        spec = two_colour_spec(3, 5, 2)
+        self.assertTrue(spec.is_valid(spec.pack((((2, 3), (1, 2)), 0))))
+        self.assertFalse(spec.is_valid(spec.pack((((2, 1), (1, 4)), 0))))
+        self.assertFalse(spec.is_valid(spec.pack((((2, 3), (0, 2)), 0))))
+        self.assertFalse(spec.is_valid(spec.pack((((2, 3), (1, 2)), 2))))
+
+    def test_moves(self):
+        spec = block_game_spec((3, 5), num_piles=3, num_hands=2, adjacent_only=True)
+        self.assertEqual([1], spec.destinations(0))
+        self.assertEqual([0, 2], spec.destinations(1))
+        # (0, 1), (0, 2), (1, 0), (1, 1), (2, 0) to each neighbouring pile
+        self.assertEqual(5, len(spec.moves[0]))
+        self.assertEqual(10, len(spec.moves[1]))
+        self.assertEqual([0, 2], block_game_spec((3, 5), num_piles=3).destinations(1))
+
+    def test_spec_is_cached(self):
+        self.assertIs(block_game_spec([3, 5], constraints=[[0, 1]]),
+                      block_game_spec((3, 5), constraints=((0, 1),)))
+
+    def test_invalid_spec(self):
+        self.assertRaises(ValueError, BlockGameSpec, ())
+        self.assertRaises(ValueError, BlockGameSpec, (3, 256))
+        self.assertRaises(ValueError, BlockGameSpec, (3, 5), num_piles=1)
+        self.assertRaises(ValueError, BlockGameSpec, (3, 5), num_hands=0)
+        self.assertRaises(ValueError, BlockGameSpec, (3, 5), constraints=((0, 2),))
+
+
+class BlockEngineNodeTests(unittest.TestCase):
+
+    def test_children_match_block_configuration_node(self):
+        spec = two_colour_spec(3, 5, 2)
+        for state in [((3, 0), (5, 0), 0), ((2, 1), (3, 2), 1), ((1, 2), (2, 3), 0)]:
+            (red_pile1, red_pile2), (blue_pile1, blue_pile2), hand_location = state
+            node = BlockEngineNode((((red_pile1, blue_pile1), (red_pile2, blue_pile2)),
+                                    hand_location), spec=spec)
+            expected = set()
+            for child in BlockConfigurationNode(state).generate_child_nodes():
+                (red_pile1, red_pile2), (blue_pile1, blue_pile2), hand_location = child.state
+                expected.add((((red_pile1, blue_pile1), (red_pile2, blue_pile2)),
+                              hand_location))
+            self.assertEqual(expected,
+                             set(child.state for child in node.generate_child_nodes()))
+
+    def test_invalid_node_has_no_children(self):
+        node = BlockEngineNode((((2, 1), (1, 4)), 0), spec=two_colour_spec(3, 5, 2))
+        self.assertFalse(node.is_valid())
+        self.assertEqual([], list(node.generate_child_nodes()))
+        self.assertEqual(0, node.candidate_child_count())
+
+    def test_candidate_child_count(self):
+        node = BlockEngineNode((((1, 1), (2, 4)), 0), spec=two_colour_spec(3, 5, 2))
+        # carrying (0, 1), (1, 0) or (1, 1); only the last two leave valid piles
+        self.assertEqual(3, node.candidate_child_count())
+        self.assertEqual({(((0, 1), (3, 4)), 1), (((0, 0), (3, 5)), 1)},
+                         set(child.state for child in node.generate_child_nodes()))
+
+    def test_goals_may_be_packed(self):
+        spec = two_colour_spec(3, 5, 2)
+        node = BlockEngineNode(spec.goal, spec=spec)
+        self.assertTrue(node.fulfills_goal(spec.goal))
+        self.assertTrue(node.fulfills_goal((((0, 0), (3, 5)), 1)))
+        self.assertEqual(spec.goal, node.goal_key((((0, 0), (3, 5)), 1)))
+        self.assertEqual(0, node.heuristic(spec.goal))
+
+    def test_heuristic(self):
+        spec = two_colour_spec(3, 5, 2)
+        node = BlockEngineNode(spec.starting_state, spec=spec)
+        self.assertEqual(4, node.heuristic(spec.goal))
+        self.assertEqual(node.canonical_key(), BlockEngineNode(
+            spec.goal, spec=spec).canonical_key())
+
+    def test_detached_node_pickles(self):
+        spec = two_colour_spec(3, 5, 2)
+        child = next(BlockEngineNode(spec.starting_state, spec=spec).generate_child_nodes())
+        copy = pickle.loads(pickle.dumps(child.detached()))
+        self.assertEqual(child.state_key(), copy.state_key())
+        self.assertEqual([child.state], copy._game_state)
+
+
+class BlockEngineSolverTests(unittest.TestCase):
+
+    def test_matches_two_colour_game(self):
+        for totals, num_hands, path_length in [((3, 5), 2, 13), ((5, 8), 3, 11),
+                                               ((10, 15), 4, 15)]:
+            spec = two_colour_spec(totals[0], totals[1], num_hands)
+            for algorithm in ('breadth_first', 'a_star', 'bidirectional',
+                              'breadth_first_to_mirror'):
+                solution = BlockEngineSolver(spec).solve(algorithm)
+                self.assertEqual(path_length + 1, len(solution), (totals, algorithm))
+                self.assertEqual(spec.unpack(spec.starting_state), solution[0])
+                self.assertEqual(spec.unpack(spec.goal), solution[-1])
+
+    def test_unsolvable(self):
+        spec = two_colour_spec(3, 3, 2)
+        for algorithm in ('breadth_first', 'depth_first', 'bidirectional'):
+            self.assertIsNone(BlockEngineSolver(spec).solve(algorithm))
+
+    def test_more_colours_and_piles(self):
+        spec = block_game_spec((2, 3, 5), num_piles=3, num_hands=2,
+                               constraints=((0, 1), (1, 2)), adjacent_only=True)
+        solution = BlockEngineSolver(spec).solve()
+        self.assertEqual(35, len(solution))
+        self.assertEqual(35, len(BlockEngineSolver(spec).solve('a_star')))
+        for state in solution:
+            self.assertTrue(spec.is_valid(spec.pack(state)))
+        for state, next_state in zip(solution, solution[1:]):
+            self.assertEqual(1, abs(state[1] - next_state[1]))
+
+    def test_budget(self):
+        result = BlockEngineSolver(two_colour_spec(10, 15, 4), max_nodes=5).solve()
+        self.assertIsInstance(result, BudgetExhausted)
+
+    def test_unknown_algorithm(self):
+        self.assertRaises(ValueError, BlockEngineSolver(two_colour_spec(3, 5, 2)).solve,
+                          'distance_table')
+
+
+if __name__ == '__main__':
+    unittest.main()
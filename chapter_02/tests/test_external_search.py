@@ -0,0 +1,87 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from external_search import ExternalBreadthFirstSearch, solve_block_game
+from moving_blocks import BlockConfigurationNode, BlockGameSolver
+
+
+class Interrupted(Exception):
+    pass
+
+
+class ExternalBreadthFirstSearchTests(unittest.TestCase):
+    """Tests for chapter_02.external_search"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertValidPath(self, path, num_hands):
+        for state, next_state in zip(path, path[1:]):
+            node1 = BlockConfigurationNode(state, num_hands=num_hands)
+            self.assertTrue(next_state in [node.state for node in node1.generate_child_nodes()])
+
+    def test_solve_block_game__same_length_as_breadth_first(self):
+        for num_red, num_blue, num_hands in ((3, 5, 2), (10, 15, 4)):
+            directory = os.path.join(self.directory, str(num_red))
+            # a small run size makes every level merge several sorted runs
+            path = solve_block_game(num_red, num_blue, num_hands, directory, run_size=7)
+            self.assertEqual(((num_red, 0), (num_blue, 0), 0), path[0])
+            self.assertEqual(((0, num_red), (0, num_blue), 1), path[-1])
+            self.assertEqual(len(BlockGameSolver(num_red, num_blue, num_hands).solve()),
+                             len(path))
+            self.assertValidPath(path, num_hands)
+
+    def test_solve_block_game__no_solution(self):
+        self.assertEqual(None, solve_block_game(3, 3, 2, self.directory))
+
+    def test_resume_after_interruption(self):
+        levels = []
+
+        def interrupt_at_level_5(level, level_size):
+            levels.append(level)
+            if level == 5:
+                raise Interrupted()
+
+        self.assertRaises(Interrupted, solve_block_game, 3, 5, 2, self.directory,
+                          on_level=interrupt_at_level_5)
+        path = solve_block_game(3, 5, 2, self.directory, on_level=interrupt_at_level_5)
+        # carries on from the last completed level instead of starting over
+        self.assertEqual(list(range(1, 14)), levels)
+        self.assertEqual(14, len(path))
+        self.assertValidPath(path, 2)
+        # only the visited file of the last level is kept
+        self.assertEqual(['visited_000013.bin'],
+                         [name for name in os.listdir(self.directory)
+                          if name.startswith('visited')])
+
+    def test_search__new_problem_starts_over(self):
+        search = ExternalBreadthFirstSearch(self.directory, lambda state: [state + 1])
+        self.assertEqual(3, search.search(0, 3))
+        self.assertEqual([0, 1, 2, 3], ExternalBreadthFirstSearch(
+            self.directory, None, predecessors=lambda state: [state - 1]).path())
+        self.assertEqual(2, search.search(5, 7))
+        self.assertEqual(0, search.search(7, 7))
+
+    def test_solve_block_game__other_game_starts_over(self):
+        # the packed starting states and goals of these games are equal
+        self.assertEqual(14, len(solve_block_game(3, 5, 2, self.directory)))
+        path = solve_block_game(3, 5, 3, self.directory)
+        self.assertEqual(len(BlockGameSolver(3, 5, 3).solve()), len(path))
+        self.assertValidPath(path, 3)
+
+        self.assertEqual(len(BlockGameSolver(1, 11, 2).solve()),
+                         len(solve_block_game(1, 11, 2, self.directory)))
+        self.assertEqual(14, len(solve_block_game(3, 5, 2, self.directory)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,18 @@ import unittest
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
 
-from moving_blocks import BlockConfigurationNode
+import moving_blocks
+from moving_blocks import (BlockConfigurationNode, BlockDistanceTable, BlockGameSolver,
+                           BlockStateCodec, iter_results, legal_moves, move_table,
+                           parse_job)
+from search import BudgetExhausted, DoesItHaveASolution
+
+
+class ReturnFinalNode(DoesItHaveASolution):
+    """Returns the final node instead of a bool, so tests can inspect the path"""
+
+    def _return_result(self, final_node, is_success):
+        return final_node if is_success else None
 
 
 class BlockConfigurationNodeTests(unittest.TestCase):
@@ -141,12 +152,313 @@ class BlockConfigurationNodeTests(unittest.TestCase):
         node1 = BlockConfigurationNode(state1)
         self.assertFalse(node1._calculate_validity(state1))
 
-    def test_calculate_validity__no_state_repeats(self):
+    def test_calculate_validity__state_repeats_left_to_search(self):
+        # repeated states are pruned by the search's visited table, not by the node
         state1 = ((3, 0), (3, 0), 0)
         node1 = BlockConfigurationNode(state1)
         node2 = BlockConfigurationNode(state1, parent=node1)
-        self.assertFalse(node2._calculate_validity(state1))
+        self.assertTrue(node2._calculate_validity(state1))
 
+    def test_game_state__rebuilt_from_parents(self):
+        state1 = ((3, 0), (4, 0), 0)
+        state2 = ((2, 1), (3, 1), 1)
+        state3 = ((3, 0), (3, 1), 0)
+        node1 = BlockConfigurationNode(state1)
+        node2 = BlockConfigurationNode(state2, parent=node1)
+        node3 = BlockConfigurationNode(state3, parent=node2)
+
+        self.assertEqual([state1, state2, state3], node3._game_state)
+        self.assertEqual(2, node3._depth)
+
+    def test_init__no_instance_dict(self):
+        node1 = BlockConfigurationNode(((3, 0), (3, 0), 0))
+        self.assertFalse(hasattr(node1, '__dict__'))
+
+    def test_init__compact(self):
+        state1 = ((3, 0), (4, 0), 0)
+        node1 = BlockConfigurationNode(state1, compact=True)
+        self.assertEqual(BlockStateCodec(3, 4).pack(state1), node1._current_state)
+        self.assertEqual(state1, node1.state)
+        self.assertTrue(node1._is_valid)
+
+    def test_generate_child_nodes__compact_matches_tuple_states(self):
+        state1 = ((3, 0), (5, 0), 0)
+        goal = ((0, 3), (0, 5), 1)
+        for compact in (False, True):
+            node1 = BlockConfigurationNode(state1, compact=compact)
+            children = list(node1.generate_child_nodes())
+            self.assertEqual([((2, 1), (4, 1), 1), ((3, 0), (3, 2), 1), ((3, 0), (4, 1), 1)],
+                             sorted(node.state for node in children))
+            self.assertEqual([state1, children[0].state], children[0]._game_state)
+            self.assertFalse(children[0].fulfills_goal(goal))
+
+    def test_generate_child_nodes(self):
+        state1 = ((3, 0), (4, 0), 0)
+        node1 = BlockConfigurationNode(state1)
+        expected_states = [
+            ((2, 1), (3, 1), 1),
+            ((3, 0), (3, 1), 1),
+        ]
+
+        child_nodes = list(node1.generate_child_nodes())
+        self.assertEqual(sorted(expected_states),
+                         sorted(node._current_state for node in child_nodes))
+        for node in child_nodes:
+            self.assertEqual(node1, node._parent)
+
+    def test_generate_child_nodes__lazy(self):
+        node1 = BlockConfigurationNode(((3, 0), (5, 0), 0))
+        child_nodes = node1.generate_child_nodes()
+        self.assertFalse(isinstance(child_nodes, list))
+        self.assertEqual(node1, next(child_nodes)._parent)
+
+    def test_generate_child_nodes__includes_move_back_to_parent_state(self):
+        state1 = ((3, 0), (4, 0), 0)
+        node1 = BlockConfigurationNode(state1)
+        node2 = BlockConfigurationNode(((2, 1), (3, 1), 1), parent=node1)
+        self.assertTrue(state1 in [node._current_state for node in node2.generate_child_nodes()])
+
+    def test_generate_child_nodes__invalid_node_has_no_children(self):
+        node1 = BlockConfigurationNode(((3, 0), (2, 1), 0))
+        self.assertEqual([], list(node1.generate_child_nodes()))
+
+    def test_generate_child_nodes_for_level__same_as_generate_child_nodes(self):
+        numpy = moving_blocks.numpy
+        nodes = [BlockConfigurationNode(((3, 0), (5, 0), 0), num_hands=3),
+                 BlockConfigurationNode(((1, 2), (2, 3), 1), num_hands=3),
+                 BlockConfigurationNode(((3, 0), (2, 3), 0), num_hands=3),
+                 BlockConfigurationNode(((0, 3), (0, 5), 1), num_hands=3)]
+        expected = [[child.state for child in node.generate_child_nodes()] for node in nodes]
+        try:
+            for numpy_module in (numpy, None):
+                moving_blocks.numpy = numpy_module
+                child_nodes = BlockConfigurationNode.generate_child_nodes_for_level(nodes)
+                self.assertEqual(expected, [[child.state for child in children]
+                                            for children in child_nodes])
+                for node, children in zip(nodes, child_nodes):
+                    for child in children:
+                        self.assertTrue(child._parent is node)
+        finally:
+            moving_blocks.numpy = numpy
+
+    @unittest.skipIf(moving_blocks.numpy is None, 'NumPy is not installed')
+    def test_generate_child_nodes_for_level__compact(self):
+        nodes = [BlockConfigurationNode(((3, 0), (5, 0), 0), compact=True)]
+        child_nodes = BlockConfigurationNode.generate_child_nodes_for_level(nodes)[0]
+        self.assertEqual([child.state for child in nodes[0].generate_child_nodes()],
+                         [child.state for child in child_nodes])
+        self.assertEqual([child._current_state for child in nodes[0].generate_child_nodes()],
+                         [child._current_state for child in child_nodes])
+
+    def test_fulfills_goal(self):
+        state1 = ((0, 2), (0, 3), 1)
+        node1 = BlockConfigurationNode(state1)
+        self.assertTrue(node1.fulfills_goal(state1))
+        self.assertFalse(node1.fulfills_goal(((0, 2), (0, 3), 0)))
+
+    def test_heuristic(self):
+        goal = ((0, 3), (0, 5), 1)
+        self.assertEqual(0, BlockConfigurationNode(goal).heuristic(goal))
+        # 8 blocks, two hands: each round trip only gains one block
+        self.assertEqual(13, BlockConfigurationNode(((3, 0), (5, 0), 0)).heuristic(goal))
+        self.assertEqual(1, BlockConfigurationNode(((1, 2), (0, 5), 0)).heuristic(goal))
+        # hands on the wrong side must carry something back first
+        self.assertEqual(2, BlockConfigurationNode(((1, 2), (0, 5), 1)).heuristic(goal))
+        self.assertEqual(3, BlockConfigurationNode(((0, 3), (0, 5), 0)).heuristic(goal))
+
+    def test_heuristic__never_overestimates(self):
+        goal = ((0, 3), (0, 5), 1)
+        for pile1_red in range(4):
+            for pile1_blue in range(6):
+                for hand_location in (0, 1):
+                    state = ((pile1_red, 3 - pile1_red), (pile1_blue, 5 - pile1_blue),
+                             hand_location)
+                    node = BlockConfigurationNode(state)
+                    final_node = ReturnFinalNode().breadth_first(node, goal)
+                    if node.is_valid() and final_node:
+                        self.assertTrue(node.heuristic(goal) <= final_node._depth)
+
+    def test_state_key(self):
+        state1 = ((2, 1), (3, 1), 1)
+        self.assertEqual(state1, BlockConfigurationNode(state1).state_key())
+
+
+class BlockGameSearchTests(unittest.TestCase):
+    """Tests for searching the block game with chapter_02.search.DoesItHaveASolution"""
+
+    def test_breadth_first__has_solution(self):
+        node1 = BlockConfigurationNode(((3, 0), (5, 0), 0))
+        self.assertTrue(DoesItHaveASolution().breadth_first(node1, ((0, 3), (0, 5), 1)))
+
+    def test_depth_first__has_solution(self):
+        node1 = BlockConfigurationNode(((3, 0), (5, 0), 0))
+        self.assertTrue(DoesItHaveASolution().depth_first(node1, ((0, 3), (0, 5), 1)))
+
+    def test_a_star__shortest_path(self):
+        for num_red, num_blue, num_hands in ((3, 5, 2), (5, 8, 3), (10, 15, 4)):
+            goal = ((0, num_red), (0, num_blue), 1)
+            bfs = ReturnFinalNode(collect_stats=True)
+            bfs_node = bfs.breadth_first(
+                BlockConfigurationNode(((num_red, 0), (num_blue, 0), 0), num_hands=num_hands),
+                goal)
+            a_star = ReturnFinalNode(collect_stats=True)
+            a_star_node = a_star.a_star(
+                BlockConfigurationNode(((num_red, 0), (num_blue, 0), 0), num_hands=num_hands),
+                goal)
+
+            self.assertEqual(bfs_node._depth, a_star_node._depth)
+            self.assertTrue(a_star.last_stats.nodes_expanded <
+                            bfs.last_stats.nodes_expanded)
+
+    def test_bidirectional__shortest_path(self):
+        for num_red, num_blue, num_hands in ((3, 5, 2), (5, 8, 3), (10, 15, 4)):
+            starting_state = ((num_red, 0), (num_blue, 0), 0)
+            goal = ((0, num_red), (0, num_blue), 1)
+            bfs_node = ReturnFinalNode().breadth_first(
+                BlockConfigurationNode(starting_state, num_hands=num_hands), goal)
+            final_node = ReturnFinalNode().bidirectional(
+                BlockConfigurationNode(starting_state, num_hands=num_hands),
+                BlockConfigurationNode(goal, num_hands=num_hands))
+
+            self.assertEqual(bfs_node._depth, final_node._depth)
+            self.assertEqual(starting_state, final_node._game_state[0])
+            self.assertTrue(final_node.fulfills_goal(goal))
+
+    def test_bidirectional__no_solution(self):
+        node1 = BlockConfigurationNode(((3, 0), (3, 0), 0))
+        goal_node = BlockConfigurationNode(((0, 3), (0, 3), 1))
+        self.assertFalse(DoesItHaveASolution().bidirectional(node1, goal_node))
+
+    def test_generate_parent_nodes__moves_are_reversible(self):
+        node1 = BlockConfigurationNode(((2, 1), (4, 1), 1))
+        for parent_node in node1.generate_parent_nodes():
+            self.assertTrue(node1.state in
+                            [node.state for node in parent_node.generate_child_nodes()])
+
+    def test_iterative_deepening__shortest_path(self):
+        starting_state = ((3, 0), (5, 0), 0)
+        goal = ((0, 3), (0, 5), 1)
+        final_node = ReturnFinalNode().iterative_deepening(
+            BlockConfigurationNode(starting_state), goal)
+        self.assertEqual(13, final_node._depth)
+
+    def test_parallel_breadth_first__same_path_as_breadth_first(self):
+        starting_state = ((5, 0), (8, 0), 0)
+        goal = ((0, 5), (0, 8), 1)
+        bfs_node = ReturnFinalNode().breadth_first(
+            BlockConfigurationNode(starting_state, num_hands=3), goal)
+        for workers in (1, 2):
+            final_node = ReturnFinalNode().parallel_breadth_first(
+                BlockConfigurationNode(starting_state, num_hands=3), goal, workers=workers,
+                chunk_size=2)
+            self.assertEqual(bfs_node._game_state, final_node._game_state)
+
+    def test_detached_and_attach(self):
+        node1 = BlockConfigurationNode(((3, 0), (5, 0), 0))
+        node2 = next(node1.generate_child_nodes())
+        detached = node2.detached()
+        self.assertEqual(None, detached._parent)
+        self.assertEqual(node2.state, detached.state)
+        self.assertEqual(node2._depth, detached._depth)
+        detached.attach(node1)
+        self.assertEqual(node2._game_state, detached._game_state)
+
+    def test_a_star__no_solution(self):
+        node1 = BlockConfigurationNode(((3, 0), (3, 0), 0))
+        self.assertFalse(DoesItHaveASolution().a_star(node1, ((0, 3), (0, 3), 1)))
+
+    def test_iter_solutions__simple_paths_shortest_first(self):
+        node1 = BlockConfigurationNode(((3, 0), (5, 0), 0))
+        search = DoesItHaveASolution(max_depth=15)
+        lengths = []
+        for final_node in search.iter_solutions(node1, ((0, 3), (0, 5), 1)):
+            states = []
+            node = final_node
+            while node is not None:
+                states.append(node.state)
+                node = node._parent
+            # no state repeats on a path
+            self.assertEqual(len(states), len(set(states)))
+            lengths.append(final_node._depth)
+        self.assertEqual(13, lengths[0])
+        self.assertEqual(sorted(lengths), lengths)
+        self.assertTrue(len(lengths) > 1)
+
+    def test_breadth_first_to_mirror__same_length_as_breadth_first(self):
+        for num_red, num_blue, num_hands in ((3, 5, 2), (5, 8, 3), (10, 15, 4)):
+            goal = ((0, num_red), (0, num_blue), 1)
+            for compact in (False, True):
+                node1 = BlockConfigurationNode(((num_red, 0), (num_blue, 0), 0),
+                                               num_hands=num_hands, compact=compact)
+                bfs = ReturnFinalNode(collect_stats=True)
+                bfs_node = bfs.breadth_first(node1, goal)
+                mirror = ReturnFinalNode(collect_stats=True)
+                final_node = mirror.breadth_first_to_mirror(node1)
+                self.assertTrue(final_node.fulfills_goal(goal))
+                self.assertEqual(bfs_node._depth, final_node._depth)
+                self.assertTrue(mirror.last_stats.states_visited <
+                                bfs.last_stats.states_visited)
+
+        node1 = BlockConfigurationNode(((3, 0), (3, 0), 0))
+        self.assertFalse(DoesItHaveASolution().breadth_first_to_mirror(node1))
+
+    def test_breadth_first_to_mirror__max_depth_limits_whole_path(self):
+        # the only solutions take 3 moves
+        result = BlockGameSolver(0, 3, 2, max_depth=2).solve('breadth_first_to_mirror')
+        self.assertTrue(isinstance(result, BudgetExhausted))
+        self.assertEqual(BudgetExhausted.MAX_DEPTH, result.reason)
+        self.assertEqual(4, len(BlockGameSolver(0, 3, 2, max_depth=3).solve(
+            'breadth_first_to_mirror')))
+        for max_depth in range(13):
+            result = BlockGameSolver(3, 5, 2, max_depth=max_depth).solve(
+                'breadth_first_to_mirror')
+            self.assertTrue(isinstance(result, BudgetExhausted))
+        self.assertEqual(14, len(BlockGameSolver(3, 5, 2, max_depth=13).solve(
+            'breadth_first_to_mirror')))
+
+    def test_breadth_first_to_goals__same_as_one_search_per_goal(self):
+        goals = [((0, 5), (0, 8), 1), ((2, 3), (3, 5), 0), ((1, 4), (1, 7), 1),
+                 ((5, 0), (8, 0), 0), ((4, 1), (3, 5), 1), ((0, 3), (0, 8), 1)]
+        for compact in (False, True):
+            node1 = BlockConfigurationNode(((5, 0), (8, 0), 0), num_hands=3, compact=compact)
+            results = ReturnFinalNode().breadth_first_to_goals(node1, goals)
+            for goal in goals:
+                final_node = ReturnFinalNode().breadth_first(node1, goal)
+                if final_node is None:
+                    self.assertEqual(None, results[goal])
+                else:
+                    self.assertTrue(results[goal].fulfills_goal(goal))
+                    self.assertEqual(final_node._depth, results[goal]._depth)
+
+    def test_breadth_first__no_solution(self):
+        # with equal counts, the first red block moved always outnumbers the blues
+        node1 = BlockConfigurationNode(((3, 0), (3, 0), 0))
+        self.assertFalse(DoesItHaveASolution().breadth_first(node1, ((0, 3), (0, 3), 1)))
+
+    def test_breadth_first__each_state_expanded_once(self):
+        search = DoesItHaveASolution(collect_stats=True)
+        node1 = BlockConfigurationNode(((5, 0), (8, 0), 0), num_hands=3)
+        search.breadth_first(node1, ((0, 5), (0, 8), 1))
+        stats = search.last_stats
+        self.assertTrue(stats.duplicates_pruned > 0)
+        self.assertTrue(stats.nodes_expanded <= stats.states_visited)
+        # 6 * 9 pile configurations, each with 2 hand positions
+        self.assertTrue(stats.states_visited <= 6 * 9 * 2)
+
+    def test_breadth_first__invalid_children_counted(self):
+        search = DoesItHaveASolution(collect_stats=True)
+        node1 = BlockConfigurationNode(((3, 0), (5, 0), 0))
+        search.breadth_first(node1, ((0, 3), (0, 5), 1))
+        # moving a red block on its own is legal but leaves it outnumbering the blues
+        self.assertTrue(search.last_stats.invalid_discarded > 0)
+        self.assertEqual(13, search.last_stats.max_depth)
+
+    def test_breadth_first__bounded_visited_table(self):
+        search = DoesItHaveASolution(max_visited=8, collect_stats=True)
+        node1 = BlockConfigurationNode(((3, 0), (5, 0), 0))
+        self.assertTrue(search.breadth_first(node1, ((0, 3), (0, 5), 1)))
+        self.assertEqual(8, search.last_stats.states_visited)
+        self.assertTrue(search.last_stats.evictions > 0)
 
     '''
 
@@ -180,9 +492,180 @@ class BlockConfigurationNodeTests(unittest.TestCase):
         self.assertEqual(expected_repr, node1._repr_for_state(starting_state))
     '''
 
-    # tests for total_red_and_blue_count_for_state
+    def test_total_red_and_blue_count_for_state(self):
+        state1 = ((2, 1), (3, 2), 0)
+        codec = BlockStateCodec.for_state(state1)
+        self.assertEqual((3, 5), BlockConfigurationNode.total_red_and_blue_count_for_state(state1))
+        self.assertEqual((3, 5), BlockConfigurationNode.total_red_and_blue_count_for_state(
+            codec.pack(state1), codec=codec))
+
+    def test_red_and_blue_counts_for_each_pile(self):
+        state1 = ((2, 1), (3, 2), 0)
+        codec = BlockStateCodec.for_state(state1)
+        expected = ((2, 3), (1, 2))
+        self.assertEqual(expected, BlockConfigurationNode.red_and_blue_counts_for_each_pile(state1))
+        self.assertEqual(expected, BlockConfigurationNode.red_and_blue_counts_for_each_pile(
+            codec.pack(state1), codec=codec))
+
+
+class MoveTableTests(unittest.TestCase):
+    """Tests for chapter_02.moving_blocks.move_table and legal_moves"""
+
+    def test_move_table__shared_between_nodes(self):
+        node1 = BlockConfigurationNode(((3, 0), (5, 0), 0))
+        node2 = BlockConfigurationNode(((0, 3), (2, 3), 1))
+        self.assertTrue(node1._calculate_possible_moves() is node2._calculate_possible_moves())
+        self.assertTrue(move_table(3, 5, 2) is node1._calculate_possible_moves())
+
+    def test_legal_moves__limited_by_pile(self):
+        pile1_moves = legal_moves(0, 1, 2, BlockConfigurationNode.PILE1_INDEX)
+        self.assertEqual((((0, 0), (-1, 1)),), pile1_moves)
+        pile2_moves = legal_moves(1, 1, 1, BlockConfigurationNode.PILE2_INDEX)
+        self.assertEqual([((0, 0), (1, -1)), ((1, -1), (0, 0))], sorted(pile2_moves))
+
+    def test_legal_moves__large_piles_share_table(self):
+        self.assertTrue(legal_moves(10, 20, 2, 0) is legal_moves(2, 2, 2, 0))
+        self.assertEqual(move_table(3, 5, 2)[0], legal_moves(10, 20, 2, 0))
+
+
+class BlockStateCodecTests(unittest.TestCase):
+    """Tests for chapter_02.moving_blocks.BlockStateCodec"""
+
+    def test_pack_and_unpack__round_trip(self):
+        codec = BlockStateCodec(3, 5)
+        seen = set()
+        for pile1_red in range(4):
+            for pile1_blue in range(6):
+                for hand_location in (0, 1):
+                    state = ((pile1_red, 3 - pile1_red), (pile1_blue, 5 - pile1_blue),
+                             hand_location)
+                    packed = codec.pack(state)
+                    self.assertEqual(state, codec.unpack(packed))
+                    seen.add(packed)
+        self.assertEqual(set(range(codec.size)), seen)
+
+    def test_mirror(self):
+        codec = BlockStateCodec(3, 5)
+        node1 = BlockConfigurationNode(((1, 2), (4, 1), 0))
+        self.assertEqual(((2, 1), (1, 4), 1), node1.mirror_key())
+        self.assertEqual(codec.pack(((2, 1), (1, 4), 1)),
+                         codec.mirror(codec.pack(((1, 2), (4, 1), 0))))
+        compact_node = BlockConfigurationNode(((1, 2), (4, 1), 0), compact=True)
+        self.assertEqual(codec.pack(node1.mirror_key()), compact_node.mirror_key())
+        self.assertEqual(min(node1.state_key(), node1.mirror_key()), node1.canonical_key())
+
+
+class BlockDistanceTableTests(unittest.TestCase):
+    """Tests for chapter_02.moving_blocks.BlockDistanceTable"""
+
+    def test_distance__matches_breadth_first(self):
+        goal = ((0, 5), (0, 8), 1)
+        table = BlockDistanceTable(goal, num_hands=3)
+        codec = BlockStateCodec(5, 8)
+        for packed_state in range(codec.size):
+            state = codec.unpack(packed_state)
+            node1 = BlockConfigurationNode(state, num_hands=3)
+            final_node = ReturnFinalNode().breadth_first(node1, goal)
+            if final_node is None:
+                self.assertEqual(None, table.distance(state))
+            else:
+                self.assertEqual(final_node._depth, table.distance(state))
+
+    def test_path(self):
+        goal = ((0, 3), (0, 5), 1)
+        table = BlockDistanceTable(goal)
+        path = table.path(((3, 0), (5, 0), 0))
+        self.assertEqual(14, len(path))
+        self.assertEqual(goal, path[-1])
+        for state, next_state in zip(path, path[1:]):
+            node1 = BlockConfigurationNode(state)
+            self.assertTrue(next_state in [node.state for node in node1.generate_child_nodes()])
+        self.assertEqual([goal], table.path(goal))
+
+    def test_final_node(self):
+        goal = ((0, 3), (0, 5), 1)
+        table = BlockDistanceTable(goal)
+        for compact in (False, True):
+            final_node = table.final_node(((3, 0), (5, 0), 0), compact=compact)
+            self.assertTrue(final_node.fulfills_goal(goal))
+            self.assertEqual(table.path(((3, 0), (5, 0), 0)), final_node._game_state)
+
+    def test_unreachable_and_foreign_states(self):
+        table = BlockDistanceTable(((0, 3), (0, 3), 1))
+        self.assertEqual(None, table.distance(((3, 0), (3, 0), 0)))
+        self.assertEqual(None, table.path(((3, 0), (3, 0), 0)))
+        self.assertEqual(None, table.final_node(((3, 0), (3, 0), 0)))
+        # different block totals, or an invalid state
+        self.assertEqual(None, table.distance(((2, 0), (3, 0), 0)))
+        self.assertEqual(None, table.distance(((3, 0), (2, 1), 0)))
+        # hands on neither pile
+        table = moving_blocks.distance_table(3, 5, 2)
+        for hand_location in (2, 7, -1):
+            self.assertEqual(None, table.distance(((0, 3), (0, 5), hand_location)))
+            self.assertEqual(None, table.path(((0, 3), (0, 5), hand_location)))
+
+
+class BlockGameSolverTests(unittest.TestCase):
+    """Tests for chapter_02.moving_blocks.BlockGameSolver and the batch solver"""
+
+    def test_solve__every_algorithm(self):
+        for algorithm in BlockGameSolver.ALGORITHMS:
+            path = BlockGameSolver(3, 5, 2).solve(algorithm)
+            self.assertEqual(((3, 0), (5, 0), 0), path[0])
+            self.assertEqual(((0, 3), (0, 5), 1), path[-1])
+            if algorithm not in ('depth_first', 'greedy_best_first'):
+                self.assertEqual(14, len(path))
+        self.assertEqual(None, BlockGameSolver(3, 3, 2).solve('distance_table'))
+        self.assertEqual(None, BlockGameSolver(3, 3, 2).solve('breadth_first'))
+
+    def test_solve__budget_and_unknown_algorithm(self):
+        result = BlockGameSolver(3, 5, 2, max_nodes=2).solve('breadth_first')
+        self.assertTrue(isinstance(result, BudgetExhausted))
+        self.assertRaises(ValueError, BlockGameSolver(3, 5, 2).solve, 'guess')
+
+    def test_solve__depth_first_within_max_depth(self):
+        # depth-first search first meets some states deeper than their shortest path
+        for num_red, num_blue, num_hands in ((5, 8, 4), (3, 5, 2), (10, 15, 4)):
+            optimum = len(BlockGameSolver(num_red, num_blue, num_hands).solve()) - 1
+            path = BlockGameSolver(num_red, num_blue, num_hands,
+                                   max_depth=optimum + 2).solve('depth_first')
+            self.assertFalse(isinstance(path, BudgetExhausted))
+            self.assertTrue(len(path) - 1 <= optimum + 2)
+
+    def test_parse_job(self):
+        expected = {'num_red_blocks': 3, 'num_blue_blocks': 5, 'num_hands': 2,
+                    'algorithm': 'breadth_first'}
+        self.assertEqual(expected, parse_job('3 5 2\n'))
+        self.assertEqual(expected, parse_job('{"num_red_blocks": 3, "num_blue_blocks": 5, '
+                                             '"num_hands": 2}'))
+        self.assertEqual('a_star', parse_job('3 5 2 a_star')['algorithm'])
+        self.assertEqual(None, parse_job('  '))
+        self.assertEqual(None, parse_job('# comment'))
+        for line in ('3 5', '3 5 2 guess', 'a b c', '{"num_red_blocks": 3}',
+                     '{"num_red_blocks": null, "num_blue_blocks": 5, "num_hands": 2}',
+                     '{"num_red_blocks": 3, "num_blue_blocks": [5], "num_hands": 2}',
+                     '{"num_red_blocks": 2.7, "num_blue_blocks": 5, "num_hands": 2}',
+                     '{"num_red_blocks": 3, "num_blue_blocks": true, "num_hands": 2}',
+                     '-1 3 2', '3 5 2.5'):
+            self.assertRaises(ValueError, parse_job, line)
+
+    def test_iter_results(self):
+        lines = ['3 5 2', 'bad line',
+                 '{"num_red_blocks": null, "num_blue_blocks": 5, "num_hands": 2}',
+                 '3 3 2 distance_table']
+        for workers in (1, 2):
+            results = sorted(iter_results(lines, workers=workers, include_path=False),
+                             key=lambda result: result['line'])
+            self.assertEqual([1, 2, 3, 4], [result['line'] for result in results])
+            self.assertEqual(('solved', 13), (results[0]['outcome'], results[0]['moves']))
+            self.assertFalse('path' in results[0])
+            self.assertTrue('error' in results[1])
+            self.assertTrue('error' in results[2])
+            self.assertEqual('no_solution', results[3]['outcome'])
+
+        result = next(iter_results(['2 3 2 a_star'], search_options={'max_nodes': 1}))
+        self.assertEqual(('budget_exhausted', 'max_nodes'), (result['outcome'], result['reason']))
 
-    # tests for red_and_blue_counts_for_each_pile
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,580 @@
+import asyncio
+import os
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+import search as search_module
+from search import (AbstractNode, BudgetExhausted, DoesItHaveASolution,
+                    PriorityFrontier, QueueFrontier, SearchHooks, StackFrontier,
+                    VisitedTable)
+
+
+GRAPH = {
+    'a': ['b', 'c'],
+    'b': ['d', 'e'],
+    'c': ['f'],
+    'd': [],
+    'e': ['g'],
+    'f': ['g'],
+    'g': [],
+}
+
+
+# number of edges to 'g'
+DISTANCE_TO_G = {'a': 3, 'b': 2, 'c': 2, 'd': 99, 'e': 1, 'f': 1, 'g': 0}
+
+
+class GraphNode(AbstractNode):
+    """Minimal node walking the GRAPH dictionary, used to exercise AbstractSearch"""
+
+    expanded = []
+
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+
+    def generate_child_nodes(self):
+        GraphNode.expanded.append(self.name)
+        return [GraphNode(name, self) for name in GRAPH[self.name]]
+
+    def generate_parent_nodes(self):
+        GraphNode.expanded.append(self.name)
+        return [GraphNode(name, self) for name in sorted(GRAPH)
+                if self.name in GRAPH[name]]
+
+    def fulfills_goal(self, goal):
+        return self.name == goal
+
+    def state_key(self):
+        return self.name
+
+    def heuristic(self, goal):
+        return DISTANCE_TO_G[self.name]
+
+    def path_cost(self):
+        return len(self.path()) - 1
+
+    def path(self):
+        node, names = self, []
+        while node:
+            names.append(node.name)
+            node = node.parent
+        return list(reversed(names))
+
+
+class LineNode(AbstractNode):
+    """Node stepping along the integers, which look the same mirrored around 0"""
+
+    def __init__(self, position, parent=None):
+        self.position = position
+        self.parent = parent
+
+    def generate_child_nodes(self):
+        return [LineNode(self.position + step, self) for step in (-1, 1)]
+
+    def fulfills_goal(self, goal):
+        return self.position == goal
+
+    def state_key(self):
+        return self.position
+
+    def generate_parent_nodes(self):
+        return self.generate_child_nodes()
+
+    def mirror_key(self):
+        return -self.position
+
+    def canonical_key(self):
+        return abs(self.position)
+
+    def path(self):
+        node, positions = self, []
+        while node:
+            positions.append(node.position)
+            node = node.parent
+        return list(reversed(positions))
+
+
+class ReturnFinalNode(DoesItHaveASolution):
+    """Returns the final node instead of a bool, so tests can inspect the path"""
+
+    def _return_result(self, final_node, is_success):
+        return final_node if is_success else None
+
+
+class RecordingHooks(SearchHooks):
+    """Records every hook call as a tuple"""
+
+    def __init__(self):
+        self.calls = []
+
+    def on_goal_test(self, node, is_goal):
+        self.calls.append(('goal_test', node.name, is_goal))
+
+    def on_expand(self, node, child_nodes, depth):
+        self.calls.append(('expand', node.name, [child.name for child in child_nodes], depth))
+
+    def on_prune(self, node):
+        self.calls.append(('prune', node.name))
+
+
+class FrontierTests(unittest.TestCase):
+    """Tests for the frontier classes in chapter_02.search"""
+
+    def test_stack_frontier__first_child_popped_first(self):
+        frontier = StackFrontier()
+        frontier.push('pending')
+        frontier.extend(['first', 'second'])
+        self.assertEqual(['first', 'second', 'pending'],
+                         [frontier.pop() for _ in range(3)])
+        self.assertFalse(frontier)
+
+    def test_stack_frontier__children_taken_one_at_a_time(self):
+        taken = []
+
+        def children(names):
+            for name in names:
+                taken.append(name)
+                yield name
+
+        frontier = StackFrontier()
+        frontier.extend(children(['b', 'c']))
+        self.assertEqual('b', frontier.pop())
+        frontier.extend(children(['d']))
+        frontier.extend(children([]))
+        self.assertEqual('d', frontier.pop())
+        self.assertEqual(['b', 'd'], taken)
+        self.assertTrue(frontier)
+        self.assertEqual('c', frontier.pop())
+        self.assertFalse(frontier)
+
+    def test_queue_frontier__fifo(self):
+        frontier = QueueFrontier()
+        frontier.extend(['first', 'second'])
+        frontier.push('third')
+        self.assertEqual(['first', 'second', 'third'],
+                         [frontier.pop() for _ in range(3)])
+        self.assertFalse(frontier)
+
+    def test_priority_frontier__lowest_first_and_stable(self):
+        frontier = PriorityFrontier(len)
+        frontier.extend(['ccc', 'a', 'bb', 'b'])
+        self.assertEqual(['a', 'b', 'bb', 'ccc'],
+                         [frontier.pop() for _ in range(4)])
+
+
+class VisitedTableTests(unittest.TestCase):
+    """Tests for chapter_02.search.VisitedTable"""
+
+    def test_add__unbounded(self):
+        visited = VisitedTable()
+        self.assertTrue(visited.add('a'))
+        self.assertFalse(visited.add('a'))
+        self.assertTrue('a' in visited)
+        self.assertEqual(1, len(visited))
+
+    def test_add__evicts_least_recently_seen(self):
+        visited = VisitedTable(max_size=2)
+        visited.add('a')
+        visited.add('b')
+        # seeing 'a' again makes 'b' the oldest entry
+        visited.add('a')
+        visited.add('c')
+        self.assertEqual(2, len(visited))
+        self.assertTrue('a' in visited)
+        self.assertFalse('b' in visited)
+        self.assertEqual(1, visited.evictions)
+
+    def test_add__track_depth(self):
+        for max_size in (None, 2):
+            visited = VisitedTable(max_size=max_size, track_depth=True)
+            self.assertTrue(visited.add('a', 5))
+            self.assertFalse(visited.add('a', 5))
+            self.assertFalse(visited.add('a', 6))
+            # reached by a shorter path
+            self.assertTrue(visited.add('a', 3))
+            self.assertFalse(visited.add('a', 4))
+            self.assertEqual(1, len(visited))
+
+
+class DoesItHaveASolutionTests(unittest.TestCase):
+    """Tests for chapter_02.search.DoesItHaveASolution"""
+
+    def setUp(self):
+        GraphNode.expanded = []
+
+    def test_depth_first__order(self):
+        self.assertTrue(DoesItHaveASolution().depth_first(GraphNode('a'), 'g'))
+        self.assertEqual(['a', 'b', 'd', 'e'], GraphNode.expanded)
+
+    def test_depth_first__siblings_generated_lazily(self):
+        generated = []
+
+        class LazyGraphNode(GraphNode):
+            def generate_child_nodes(self):
+                for name in GRAPH[self.name]:
+                    generated.append(name)
+                    yield LazyGraphNode(name, self)
+
+        final_node = ReturnFinalNode().depth_first(LazyGraphNode('a'), 'g')
+        self.assertEqual(['a', 'b', 'e', 'g'], final_node.path())
+        # 'c' is never generated, and 'e' only once 'd' turns out to be a dead end
+        self.assertEqual(['b', 'd', 'e', 'g'], generated)
+
+    def test_breadth_first__order(self):
+        self.assertTrue(DoesItHaveASolution().breadth_first(GraphNode('a'), 'g'))
+        self.assertEqual(['a', 'b', 'c', 'd', 'e', 'f'], GraphNode.expanded)
+
+    def test_breadth_first__shortest_path(self):
+        final_node = ReturnFinalNode().breadth_first(GraphNode('a'), 'g')
+        self.assertEqual(['a', 'b', 'e', 'g'], final_node.path())
+
+    def test_breadth_first__duplicates_expanded_once(self):
+        search = DoesItHaveASolution(collect_stats=True)
+        self.assertFalse(search.breadth_first(GraphNode('a'), 'z'))
+        # 'g' is reachable through both 'e' and 'f'
+        self.assertEqual(1, GraphNode.expanded.count('g'))
+        self.assertEqual(7, search.last_stats.nodes_expanded)
+        self.assertEqual(7, search.last_stats.states_visited)
+        self.assertEqual(1, search.last_stats.duplicates_pruned)
+
+    def test_a_star__only_expands_shortest_path(self):
+        final_node = ReturnFinalNode().a_star(GraphNode('a'), 'g')
+        self.assertEqual(['a', 'b', 'e', 'g'], final_node.path())
+        self.assertEqual(['a', 'b', 'e'], GraphNode.expanded)
+
+    def test_bidirectional__shortest_path(self):
+        final_node = ReturnFinalNode().bidirectional(GraphNode('a'), GraphNode('g'))
+        self.assertEqual(['a', 'b', 'e', 'g'], final_node.path())
+
+    def test_bidirectional__no_solution(self):
+        self.assertFalse(DoesItHaveASolution().bidirectional(GraphNode('c'), GraphNode('d')))
+
+    def test_bidirectional__starting_node_is_goal(self):
+        final_node = ReturnFinalNode().bidirectional(GraphNode('g'), GraphNode('g'))
+        self.assertEqual(['g'], final_node.path())
+        self.assertEqual([], GraphNode.expanded)
+
+    def test_breadth_first_to_mirror(self):
+        for start in (-3, 4):
+            search = ReturnFinalNode(collect_stats=True)
+            final_node = search.breadth_first_to_mirror(LineNode(start))
+            self.assertEqual(list(range(start, -start, -1 if start > 0 else 1)) + [-start],
+                             final_node.path())
+            # states and their mirror images are only stored once; the search also
+            # wanders away from 0, to positions up to 2 * abs(start)
+            self.assertEqual(2 * abs(start) + 1, search.last_stats.states_visited)
+
+        self.assertEqual([0], ReturnFinalNode().breadth_first_to_mirror(LineNode(0)).path())
+
+    def test_greedy_best_first__follows_heuristic(self):
+        self.assertTrue(DoesItHaveASolution().greedy_best_first(GraphNode('a'), 'g'))
+        self.assertEqual(['a', 'b', 'e'], GraphNode.expanded)
+
+    def test_parallel_breadth_first__same_as_breadth_first(self):
+        final_node = ReturnFinalNode().parallel_breadth_first(GraphNode('a'), 'g', workers=1)
+        self.assertEqual(['a', 'b', 'e', 'g'], final_node.path())
+        self.assertEqual(['a', 'b', 'c', 'd', 'e'], GraphNode.expanded)
+        self.assertFalse(DoesItHaveASolution().parallel_breadth_first(GraphNode('a'), 'z',
+                                                                       workers=1))
+
+    def test_iterative_deepening__shortest_path(self):
+        final_node = ReturnFinalNode().iterative_deepening(GraphNode('a'), 'g')
+        self.assertEqual(['a', 'b', 'e', 'g'], final_node.path())
+        # one pass each for depth limits 1, 2 and 3
+        self.assertEqual(['a', 'a', 'b', 'c', 'a', 'b', 'd', 'e'], GraphNode.expanded)
+
+    def test_iterative_deepening__no_solution(self):
+        result = DoesItHaveASolution().iterative_deepening(GraphNode('a'), 'z')
+        self.assertTrue(result is False)
+
+    def test_iter_solutions__every_path_shortest_first(self):
+        solutions = DoesItHaveASolution().iter_solutions(GraphNode('a'), 'g')
+        self.assertEqual([['a', 'b', 'e', 'g'], ['a', 'c', 'f', 'g']],
+                         [final_node.path() for final_node in solutions])
+
+    def test_iter_solutions__depth_first(self):
+        solutions = DoesItHaveASolution().iter_solutions(GraphNode('a'), 'g',
+                                                         shortest_first=False)
+        self.assertEqual([['a', 'b', 'e', 'g'], ['a', 'c', 'f', 'g']],
+                         [final_node.path() for final_node in solutions])
+
+    def test_iter_solutions__lazy(self):
+        solutions = DoesItHaveASolution().iter_solutions(GraphNode('a'), 'g')
+        self.assertEqual([], GraphNode.expanded)
+        self.assertEqual(['a', 'b', 'e', 'g'], next(solutions).path())
+        self.assertEqual(['a', 'b', 'c', 'd', 'e', 'f'], GraphNode.expanded)
+
+    def test_iter_solutions__no_solution(self):
+        self.assertEqual([], list(DoesItHaveASolution().iter_solutions(GraphNode('a'), 'z')))
+
+    def test_breadth_first_to_goals(self):
+        results = ReturnFinalNode().breadth_first_to_goals(GraphNode('a'), ['g', 'c', 'z'])
+        self.assertEqual(['a', 'b', 'e', 'g'], results['g'].path())
+        self.assertEqual(['a', 'c'], results['c'].path())
+        self.assertEqual(None, results['z'])
+        # one traversal, with every state expanded once
+        self.assertEqual(sorted(GraphNode.expanded), sorted(set(GraphNode.expanded)))
+
+    def test_breadth_first_to_goals__stops_once_every_goal_is_found(self):
+        results = DoesItHaveASolution().breadth_first_to_goals(GraphNode('a'), ['b', 'c'])
+        self.assertEqual({'b': True, 'c': True}, results)
+        self.assertEqual(['a', 'b'], GraphNode.expanded)
+
+    def test_breadth_first_to_goals__budget(self):
+        search = DoesItHaveASolution(max_depth=1)
+        results = search.breadth_first_to_goals(GraphNode('a'), ['b', 'g'])
+        self.assertTrue(results['b'])
+        self.assertEqual(BudgetExhausted.MAX_DEPTH, results['g'].reason)
+
+    def test_no_solution(self):
+        self.assertFalse(DoesItHaveASolution().depth_first(GraphNode('a'), 'z'))
+        self.assertFalse(DoesItHaveASolution().breadth_first(GraphNode('a'), 'z'))
+        self.assertFalse(DoesItHaveASolution().a_star(GraphNode('a'), 'z'))
+
+    def test_starting_node_is_goal(self):
+        self.assertTrue(DoesItHaveASolution().breadth_first(GraphNode('g'), 'g'))
+        self.assertEqual([], GraphNode.expanded)
+
+
+class SearchStatsTests(unittest.TestCase):
+    """Tests for the optional SearchStats and SearchHooks of AbstractSearch"""
+
+    SEARCH_MODES = ('depth_first', 'breadth_first', 'iterative_deepening',
+                    'greedy_best_first', 'a_star')
+
+    def test_no_stats_by_default(self):
+        search = DoesItHaveASolution()
+        self.assertTrue(search.breadth_first(GraphNode('a'), 'g'))
+        self.assertTrue(search.last_stats is None)
+
+    def test_breadth_first__stats(self):
+        search = DoesItHaveASolution(collect_stats=True)
+        self.assertTrue(search.breadth_first(GraphNode('a'), 'g'))
+        stats = search.last_stats
+        self.assertEqual(6, stats.nodes_expanded)
+        # b, c, d, e, f, g and g again
+        self.assertEqual(7, stats.nodes_generated)
+        self.assertEqual(1, stats.duplicates_pruned)
+        self.assertEqual(3, stats.max_depth)
+        self.assertEqual(0, stats.invalid_discarded)
+        self.assertTrue(stats.expand_time > 0)
+        self.assertTrue(stats.goal_test_time > 0)
+
+    def test_breadth_first__hooks(self):
+        hooks = RecordingHooks()
+        search = DoesItHaveASolution(hooks=hooks)
+        self.assertTrue(search.breadth_first(GraphNode('a'), 'g'))
+        self.assertEqual(('goal_test', 'a', False), hooks.calls[0])
+        self.assertEqual(('expand', 'a', ['b', 'c'], 0), hooks.calls[1])
+        self.assertTrue(('prune', 'g') in hooks.calls)
+        self.assertEqual(('goal_test', 'g', True), hooks.calls[-1])
+        self.assertTrue(search.last_stats is not None)
+
+    def test_every_mode_counts_the_same_expansions_with_and_without_stats(self):
+        for mode in self.SEARCH_MODES:
+            GraphNode.expanded = []
+            getattr(DoesItHaveASolution(), mode)(GraphNode('a'), 'g')
+            expanded = GraphNode.expanded
+            GraphNode.expanded = []
+            search = DoesItHaveASolution(collect_stats=True)
+            getattr(search, mode)(GraphNode('a'), 'g')
+            self.assertEqual(expanded, GraphNode.expanded)
+            self.assertEqual(len(expanded), search.last_stats.nodes_expanded)
+
+        hooks = RecordingHooks()
+        search = DoesItHaveASolution(hooks=hooks)
+        search.bidirectional(GraphNode('a'), GraphNode('g'))
+        self.assertEqual(search.last_stats.nodes_expanded,
+                         len([call for call in hooks.calls if call[0] == 'expand']))
+        search = DoesItHaveASolution(hooks=hooks)
+        search.parallel_breadth_first(GraphNode('a'), 'g', workers=1)
+        self.assertEqual(5, search.last_stats.nodes_expanded)
+
+
+class SearchBudgetTests(unittest.TestCase):
+    """Tests for the max_nodes, max_depth and time_limit budgets of AbstractSearch"""
+
+    SEARCH_MODES = ('depth_first', 'breadth_first', 'iterative_deepening',
+                    'greedy_best_first', 'a_star')
+
+    def assertBudgetExhausted(self, reason, result):
+        self.assertTrue(isinstance(result, BudgetExhausted))
+        self.assertEqual(reason, result.reason)
+        self.assertFalse(result)
+
+    def test_max_nodes(self):
+        for mode in self.SEARCH_MODES:
+            search = DoesItHaveASolution(max_nodes=2, collect_stats=True)
+            result = getattr(search, mode)(GraphNode('a'), 'g')
+            self.assertBudgetExhausted(BudgetExhausted.MAX_NODES, result)
+            self.assertEqual(2, search.last_stats.nodes_expanded)
+
+        search = DoesItHaveASolution(max_nodes=1)
+        result = search.bidirectional(GraphNode('a'), GraphNode('g'))
+        self.assertBudgetExhausted(BudgetExhausted.MAX_NODES, result)
+
+    def test_max_nodes__level_by_level_modes_stop_mid_level(self):
+        for max_nodes in (1, 2, 3):
+            search = DoesItHaveASolution(max_nodes=max_nodes, collect_stats=True)
+            for result in (search.bidirectional(LineNode(-20), LineNode(20)),
+                           search.breadth_first_to_mirror(LineNode(-20)),
+                           search.parallel_breadth_first(LineNode(0), 20, workers=1,
+                                                         chunk_size=10)):
+                self.assertBudgetExhausted(BudgetExhausted.MAX_NODES, result)
+                self.assertEqual(max_nodes, search.last_stats.nodes_expanded)
+
+    def test_time_limit__ignores_wall_clock_changes(self):
+        # the wall clock jumps a day forward on every call
+        days = iter(range(0, 10 ** 9, 86400))
+        with mock.patch.object(search_module.time, 'time', side_effect=lambda: next(days)):
+            search = DoesItHaveASolution(time_limit=60)
+            self.assertTrue(search.breadth_first(LineNode(0), 50))
+            self.assertTrue(search.bidirectional(LineNode(-20), LineNode(20)))
+
+    def test_max_depth(self):
+        for mode in self.SEARCH_MODES:
+            result = getattr(DoesItHaveASolution(max_depth=2), mode)(GraphNode('a'), 'g')
+            self.assertBudgetExhausted(BudgetExhausted.MAX_DEPTH, result)
+            self.assertTrue(getattr(DoesItHaveASolution(max_depth=3), mode)(GraphNode('a'), 'g'))
+
+        result = DoesItHaveASolution(max_depth=2).bidirectional(GraphNode('a'), GraphNode('g'))
+        self.assertBudgetExhausted(BudgetExhausted.MAX_DEPTH, result)
+        self.assertTrue(DoesItHaveASolution(max_depth=3).bidirectional(GraphNode('a'),
+                                                                        GraphNode('g')))
+
+    def test_max_depth__no_solution_within_depth_is_still_failure(self):
+        self.assertTrue(DoesItHaveASolution(max_depth=10).breadth_first(GraphNode('a'), 'z')
+                        is False)
+
+    def test_time_limit(self):
+        for mode in self.SEARCH_MODES:
+            result = getattr(DoesItHaveASolution(time_limit=0), mode)(GraphNode('a'), 'g')
+            self.assertBudgetExhausted(BudgetExhausted.TIME_LIMIT, result)
+
+    def test_iter_solutions__budgets_end_the_stream(self):
+        search = DoesItHaveASolution(max_depth=2)
+        self.assertEqual([], list(search.iter_solutions(GraphNode('a'), 'g')))
+        search = DoesItHaveASolution(max_nodes=4)
+        solutions = search.iter_solutions(GraphNode('a'), 'g', shortest_first=False)
+        self.assertEqual(1, len(list(solutions)))
+
+
+class SearchAsyncTests(unittest.TestCase):
+    """Tests for AbstractSearch.search_async and run_in_executor"""
+
+    SEARCH_MODES = ('depth_first', 'breadth_first', 'iterative_deepening',
+                    'greedy_best_first', 'a_star')
+
+    def test_search_async__same_results_as_search(self):
+        for mode in self.SEARCH_MODES:
+            expected = getattr(ReturnFinalNode(), mode)(GraphNode('a'), 'g').path()
+            progress = []
+            final_node = asyncio.run(ReturnFinalNode().search_async(
+                mode, GraphNode('a'), 'g', yield_every=1, on_progress=progress.append))
+            self.assertEqual(expected, final_node.path())
+            self.assertTrue(progress)
+            counts = [snapshot.nodes_expanded for snapshot in progress]
+            self.assertEqual(sorted(set(counts)), counts)
+
+        final_node = asyncio.run(ReturnFinalNode().search_async(
+            'bidirectional', GraphNode('a'), GraphNode('g'), yield_every=1))
+        self.assertEqual(['a', 'b', 'e', 'g'], final_node.path())
+        final_node = asyncio.run(ReturnFinalNode().search_async(
+            'breadth_first_to_mirror', LineNode(-2), yield_every=1))
+        self.assertEqual([-2, -1, 0, 1, 2], final_node.path())
+        self.assertFalse(asyncio.run(DoesItHaveASolution().search_async(
+            'breadth_first', GraphNode('a'), 'z')))
+
+    def test_search_async__unknown_mode(self):
+        self.assertRaises(ValueError, asyncio.run, DoesItHaveASolution().search_async(
+            'parallel_breadth_first', GraphNode('a'), 'g'))
+
+    def test_search_async__deadline(self):
+        async def search_past_deadline():
+            deadline = asyncio.get_running_loop().time()
+            return await DoesItHaveASolution().search_async(
+                'breadth_first', LineNode(0), 'never', yield_every=10, deadline=deadline)
+
+        result = asyncio.run(search_past_deadline())
+        self.assertTrue(isinstance(result, BudgetExhausted))
+        self.assertEqual(BudgetExhausted.TIME_LIMIT, result.reason)
+
+    def test_search_async__searches_take_turns_and_can_be_cancelled(self):
+        turns = []
+
+        async def run_both():
+            endless = asyncio.ensure_future(DoesItHaveASolution().search_async(
+                'breadth_first', LineNode(0), 'never', yield_every=5,
+                on_progress=lambda progress: turns.append('endless')))
+            search = ReturnFinalNode()
+            final_node = await search.search_async(
+                'breadth_first', LineNode(0), 40, yield_every=5,
+                on_progress=lambda progress: turns.append('finite'))
+            endless.cancel()
+            try:
+                await endless
+            except asyncio.CancelledError:
+                return final_node, True
+            return final_node, False
+
+        final_node, cancelled = asyncio.run(run_both())
+        self.assertEqual(40, final_node.position)
+        self.assertTrue(cancelled)
+        # the endless search gets a turn every time the other one pauses
+        self.assertEqual(['finite', 'endless', 'finite', 'endless'], turns[:4])
+
+    def test_run_in_executor(self):
+        final_node = asyncio.run(ReturnFinalNode().run_in_executor(
+            'breadth_first', GraphNode('a'), 'g'))
+        self.assertEqual(['a', 'b', 'e', 'g'], final_node.path())
+
+    def test_run_in_executor__cancelling_stops_the_search(self):
+        executor = ThreadPoolExecutor(1)
+        search = DoesItHaveASolution(collect_stats=True)
+
+        async def cancel_endless_search():
+            task = asyncio.ensure_future(search.run_in_executor(
+                'breadth_first', LineNode(0), 'never', executor=executor))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        asyncio.run(cancel_endless_search())
+        # only returns once the search has given up
+        executor.shutdown(wait=True)
+        self.assertTrue(search.last_stats.nodes_expanded > 0)
+
+        # the cancellation only applied to that call
+        self.assertTrue(search.breadth_first(GraphNode('a'), 'g'))
+        self.assertTrue(asyncio.run(search.run_in_executor(
+            'breadth_first', GraphNode('a'), 'g')))
+
+    def test_run_in_executor__cancelling_one_call_leaves_the_other_running(self):
+        executor = ThreadPoolExecutor(2)
+        search = ReturnFinalNode()
+
+        async def cancel_first_call():
+            endless = asyncio.ensure_future(search.run_in_executor(
+                'breadth_first', LineNode(0), 'never', executor=executor))
+            await asyncio.sleep(0.05)
+            finite = asyncio.ensure_future(search.run_in_executor(
+                'breadth_first', LineNode(0), 2000, executor=executor))
+            endless.cancel()
+            return await finite
+
+        final_node = asyncio.run(cancel_first_call())
+        executor.shutdown(wait=True)
+        self.assertEqual(2000, final_node.position)
+
+
+if __name__ == '__main__':
+    unittest.main()
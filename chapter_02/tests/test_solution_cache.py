@@ -0,0 +1,114 @@
+import os
+import pickle
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from moving_blocks import solve_job
+from solution_cache import SolutionCache
+
+
+STARTING_STATE = ((3, 0), (5, 0), 0)
+GOAL = ((0, 3), (0, 5), 1)
+
+
+def read_outcome(cache):
+    """Looks up a result in a worker process"""
+    return cache.get(3, 5, 2, STARTING_STATE, GOAL, 'breadth_first')['outcome']
+
+
+class SolutionCacheTests(unittest.TestCase):
+    """Tests for chapter_02.solution_cache.SolutionCache"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'solutions.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_get_and_put(self):
+        cache = SolutionCache(self.path)
+        self.assertEqual(None, cache.get(3, 5, 2, STARTING_STATE, GOAL, 'breadth_first'))
+        cache.put(3, 5, 2, STARTING_STATE, GOAL, 'breadth_first', 'solved',
+                  path=[STARTING_STATE, GOAL], stats={'nodes_expanded': 20})
+        cache.close()
+
+        # read back by a fresh connection
+        cache = SolutionCache(self.path)
+        self.assertEqual({'outcome': 'solved', 'path': [STARTING_STATE, GOAL],
+                          'stats': {'nodes_expanded': 20}},
+                         cache.get(3, 5, 2, STARTING_STATE, GOAL, 'breadth_first'))
+        # every part of the key counts
+        self.assertEqual(None, cache.get(3, 5, 2, STARTING_STATE, GOAL, 'a_star'))
+        self.assertEqual(None, cache.get(3, 5, 3, STARTING_STATE, GOAL, 'breadth_first'))
+        self.assertEqual(None, cache.get(3, 5, 2, GOAL, STARTING_STATE, 'breadth_first'))
+        cache.close()
+
+    def test_get__does_not_wait_for_writers(self):
+        cache = SolutionCache(self.path)
+        cache.put(3, 5, 2, STARTING_STATE, GOAL, 'breadth_first', 'solved')
+        writer = sqlite3.connect(self.path, isolation_level=None)
+        writer.execute('BEGIN IMMEDIATE')
+        try:
+            started_at = time.monotonic()
+            self.assertEqual('solved', cache.get(3, 5, 2, STARTING_STATE, GOAL,
+                                                 'breadth_first')['outcome'])
+            self.assertTrue(time.monotonic() - started_at < 1.0)
+        finally:
+            writer.execute('ROLLBACK')
+            writer.close()
+        # writes still wait for the lock
+        self.assertEqual(int(SolutionCache.TIMEOUT * 1000),
+                         cache._connect().execute('PRAGMA busy_timeout').fetchone()[0])
+        cache.close()
+
+    def test_put__evicts_least_recently_used(self):
+        cache = SolutionCache(self.path, max_entries=2)
+        for num_hands in (2, 3):
+            cache.put(3, 5, num_hands, STARTING_STATE, GOAL, 'breadth_first', 'solved')
+        # using the first result makes the second the oldest
+        self.assertTrue(cache.get(3, 5, 2, STARTING_STATE, GOAL, 'breadth_first'))
+        cache.put(3, 5, 4, STARTING_STATE, GOAL, 'breadth_first', 'solved')
+        self.assertEqual(2, len(cache))
+        self.assertTrue(cache.get(3, 5, 2, STARTING_STATE, GOAL, 'breadth_first'))
+        self.assertEqual(None, cache.get(3, 5, 3, STARTING_STATE, GOAL, 'breadth_first'))
+        cache.close()
+
+    def test_shared_with_worker_processes(self):
+        cache = SolutionCache(self.path)
+        cache.put(3, 5, 2, STARTING_STATE, GOAL, 'breadth_first', 'solved')
+        self.assertEqual(self.path, pickle.loads(pickle.dumps(cache)).path)
+        with ProcessPoolExecutor(2) as executor:
+            self.assertEqual(['solved'] * 4, list(executor.map(read_outcome, [cache] * 4)))
+        cache.close()
+
+    def test_solve_job__uses_cache(self):
+        cache = SolutionCache(self.path)
+        job = {'num_red_blocks': 3, 'num_blue_blocks': 5, 'num_hands': 2,
+               'algorithm': 'breadth_first'}
+        result = solve_job(job, cache=cache)
+        self.assertFalse('cached' in result)
+        self.assertEqual(20, result['stats']['nodes_expanded'])
+
+        cached_result = solve_job(job, cache=cache)
+        self.assertTrue(cached_result['cached'])
+        for name in ('outcome', 'moves', 'path', 'stats'):
+            self.assertEqual(result[name], cached_result[name])
+
+        # results cut short by a budget are not kept
+        job['algorithm'] = 'depth_first'
+        solve_job(job, search_options={'max_nodes': 1}, cache=cache)
+        self.assertEqual(1, len(cache))
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
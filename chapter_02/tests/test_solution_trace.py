@@ -0,0 +1,103 @@
+import io
+import os
+import sys
+import unittest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from moving_blocks import BlockConfigurationNode, BlockGameSolver
+from solution_trace import (BinaryTraceWriter, JsonLinesTraceWriter, TextTraceWriter,
+                            moves_between, read_binary_trace, read_json_lines_trace,
+                            row_template, states_from_moves)
+
+
+class RowTemplateTests(unittest.TestCase):
+
+    def test_render__hand_on_left(self):
+        template = row_template(3, 5, 2)
+        self.assertEqual('[RR  | BBB  ] OO   [R   | BB   ]',
+                         template.render(((2, 1), (3, 2), 0)))
+
+    def test_render__hand_on_right(self):
+        template = row_template(3, 5, 2)
+        self.assertEqual('[RR  | BBB  ]   OO [R   | BB   ]',
+                         template.render(((2, 1), (3, 2), 1)))
+
+    def test_render__large_game(self):
+        template = row_template(20000, 30000, 2)
+        row = template.render(((5, 19995), (30000, 0), 1))
+        self.assertEqual(2 * (20000 + 30000 + 5) + 6, len(row))
+        self.assertEqual('[RRRRR ', row[:7])
+        self.assertEqual(19995, row.count('R') - 5)
+
+    def test_template_is_shared(self):
+        self.assertIs(row_template(3, 5, 2), row_template(3, 5, 2))
+        self.assertIsNot(row_template(3, 5, 2), row_template(3, 5, 3))
+
+    def test_node_repr(self):
+        node1 = BlockConfigurationNode(((3, 0), (3, 0), 0), num_hands=3)
+        expected1 = '[RRR | BBB] OOO    [    |    ]'
+        self.assertEqual(expected1, repr(node1))
+
+        node2 = BlockConfigurationNode(((2, 1), (2, 1), 1), parent=node1)
+        expected2 = os.linesep.join([expected1, '[RR  | BB ]    OOO [R   | B  ]'])
+        self.assertEqual(expected2, repr(node2))
+        self.assertEqual('[RR  | BB ]    OOO [R   | B  ]',
+                         node2._repr_for_state(((2, 1), (2, 1), 1)))
+
+
+class TraceWriterTests(unittest.TestCase):
+
+    def setUp(self):
+        self.solution = BlockGameSolver(3, 5, 2).solve()
+        self.other_solution = BlockGameSolver(5, 8, 3).solve()
+
+    def test_moves_round_trip(self):
+        moves = list(moves_between(self.solution[0], self.solution[1:]))
+        self.assertEqual(len(self.solution) - 1, len(moves))
+        self.assertEqual(self.solution, states_from_moves(self.solution[0], moves))
+
+    def test_text(self):
+        trace = io.StringIO()
+        writer = TextTraceWriter(trace)
+        writer.write(iter(self.solution), 2)
+        writer.write(self.solution[:1], 2)
+
+        node = BlockConfigurationNode(self.solution[0], num_hands=2)
+        for state in self.solution[1:]:
+            node = BlockConfigurationNode(state, parent=node)
+        expected = repr(node).replace(os.linesep, '\n') + '\n\n' + \
+            row_template(3, 5, 2).render(self.solution[0]) + '\n'
+        self.assertEqual(expected, trace.getvalue())
+
+    def test_json_lines(self):
+        trace = io.StringIO()
+        JsonLinesTraceWriter(trace).write_all(
+            iter([self.solution, self.other_solution]), 2)
+        self.assertEqual(2, trace.getvalue().count('\n'))
+
+        trace.seek(0)
+        solutions = list(read_json_lines_trace(trace))
+        self.assertEqual([(self.solution, 2), (self.other_solution, 2)], solutions)
+
+    def test_binary(self):
+        trace = io.BytesIO()
+        writer = BinaryTraceWriter(trace)
+        writer.write(self.solution, 2)
+        writer.write(self.other_solution, 3)
+        self.assertEqual(2 * BinaryTraceWriter.RECORD.size +
+                         4 * (len(self.solution) + len(self.other_solution) - 2),
+                         len(trace.getvalue()))
+
+        trace.seek(0)
+        solutions = list(read_binary_trace(trace))
+        self.assertEqual([(self.solution, 2), (self.other_solution, 3)], solutions)
+
+    def test_empty_solution(self):
+        self.assertRaises(ValueError, JsonLinesTraceWriter(io.StringIO()).write, [], 2)
+        self.assertRaises(ValueError, BinaryTraceWriter(io.BytesIO()).write, iter([]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()